@@ -7,11 +7,13 @@ Stores and retrieves Claude's session summaries for dashboard display
 import json
 import logging
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+SESSION_ICONS = {"morning": "🌅", "evening": "🌆"}
+
 class ClaudeSummaryManager:
     """Manages Claude session summaries for dashboard display"""
     
@@ -50,36 +52,38 @@ class ClaudeSummaryManager:
                 "session_history": []
             }
     
+    def _session_record(self, kind: str, summary: str, **details) -> Dict[str, Any]:
+        """Build a dated session history record"""
+        now = datetime.now()
+        return {
+            "type": kind,
+            "summary": f"{SESSION_ICONS[kind]} {summary} - {now.strftime('%B %d, %Y')}",
+            "timestamp": now.isoformat(),
+            **details
+        }
+    
+    def _append_sessions(self, data: Dict[str, Any], records: List[Dict[str, Any]]):
+        """Append session records and point the latest summary at the newest one"""
+        data["session_history"].extend(records)
+        data["latest_summary"] = records[-1]["summary"]
+        data["last_updated"] = records[-1]["timestamp"]
+        
+        # Keep only last 10 sessions
+        if len(data["session_history"]) > 10:
+            data["session_history"] = data["session_history"][-10:]
+    
     def save_morning_summary(self, summary: str, opportunities_count: int, market_analysis: str):
         """Save a morning session summary"""
         try:
+            record = self._session_record(
+                "morning", summary,
+                opportunities_count=opportunities_count,
+                market_analysis=market_analysis
+            )
             data = self.load_summary_data()
-            
-            # Format the summary with date
-            formatted_date = datetime.now().strftime("%B %d, %Y")
-            full_summary = f"🌅 {summary} - {formatted_date}"
-            
-            # Update latest summary
-            data["latest_summary"] = full_summary
-            data["last_updated"] = datetime.now().isoformat()
-            
-            # Add to history
-            session_record = {
-                "type": "morning",
-                "summary": full_summary,
-                "timestamp": datetime.now().isoformat(),
-                "opportunities_count": opportunities_count,
-                "market_analysis": market_analysis
-            }
-            
-            data["session_history"].append(session_record)
-            
-            # Keep only last 10 sessions
-            if len(data["session_history"]) > 10:
-                data["session_history"] = data["session_history"][-10:]
-            
+            self._append_sessions(data, [record])
             self.save_summary_data(data)
-            logger.info(f"💾 Saved morning summary: {full_summary}")
+            logger.info(f"💾 Saved morning summary: {record['summary']}")
             
         except Exception as e:
             logger.error(f"Failed to save morning summary: {e}")
@@ -87,37 +91,33 @@ class ClaudeSummaryManager:
     def save_evening_summary(self, summary: str, portfolio_performance: str, next_day_outlook: str):
         """Save an evening session summary"""
         try:
+            record = self._session_record(
+                "evening", summary,
+                portfolio_performance=portfolio_performance,
+                next_day_outlook=next_day_outlook
+            )
             data = self.load_summary_data()
-            
-            # Format the summary with date
-            formatted_date = datetime.now().strftime("%B %d, %Y")
-            full_summary = f"🌆 {summary} - {formatted_date}"
-            
-            # Update latest summary
-            data["latest_summary"] = full_summary
-            data["last_updated"] = datetime.now().isoformat()
-            
-            # Add to history
-            session_record = {
-                "type": "evening",
-                "summary": full_summary,
-                "timestamp": datetime.now().isoformat(),
-                "portfolio_performance": portfolio_performance,
-                "next_day_outlook": next_day_outlook
-            }
-            
-            data["session_history"].append(session_record)
-            
-            # Keep only last 10 sessions
-            if len(data["session_history"]) > 10:
-                data["session_history"] = data["session_history"][-10:]
-            
+            self._append_sessions(data, [record])
             self.save_summary_data(data)
-            logger.info(f"💾 Saved evening summary: {full_summary}")
+            logger.info(f"💾 Saved evening summary: {record['summary']}")
             
         except Exception as e:
             logger.error(f"Failed to save evening summary: {e}")
     
+    def save_batch(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        """Save several (kind, fields) session summaries with one file read and write"""
+        if not batch:
+            return
+        try:
+            records = [self._session_record(kind, **fields) for kind, fields in batch]
+            data = self.load_summary_data()
+            self._append_sessions(data, records)
+            self.save_summary_data(data)
+            logger.info(f"💾 Saved {len(records)} session summaries")
+            
+        except Exception as e:
+            logger.error(f"Failed to save summary batch: {e}")
+    
     def get_latest_summary(self) -> str:
         """Get the latest Claude summary for dashboard display"""
         try:
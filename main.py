@@ -18,7 +18,9 @@ from fastapi.responses import RedirectResponse
 from src.core.config import settings
 from src.api.routes import health, portfolio, trading, claude_chat, email_test, dashboard
 from src.core.database import init_database
+from src.core.http_client import close_http_client
 from src.core.scheduler import TradingScheduler
+from src.services.claude_service import close_market_data, flush_summaries
 
 # Configure logging
 logging.basicConfig(
@@ -94,6 +96,10 @@ async def shutdown_event():
         await scheduler.stop()
         logger.info("✅ Trading scheduler stopped")
     
+    await flush_summaries()
+    await close_market_data()
+    await close_http_client()
+    
     logger.info("👋 Vibe Investor shutdown complete")
 
 @app.get("/")
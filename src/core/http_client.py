@@ -0,0 +1,35 @@
+"""
+Shared HTTP connection pool for outbound API calls
+"""
+
+import logging
+from typing import Optional
+
+import httpx
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the process-wide HTTP client, creating it on first use"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.CLAUDE_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.CLAUDE_MAX_KEEPALIVE,
+            ),
+            timeout=httpx.Timeout(settings.CLAUDE_TIMEOUT, connect=settings.CLAUDE_CONNECT_TIMEOUT),
+        )
+    return _http_client
+
+async def close_http_client():
+    """Close the shared HTTP client and its pooled connections"""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+        logger.info("🔌 HTTP connections closed")
+    _http_client = None
@@ -6,10 +6,11 @@ Pydantic models for options positions, Greeks, strategies, and Claude decisions
 from datetime import datetime, date
 from decimal import Decimal
 from enum import Enum
+from operator import attrgetter
 from typing import Dict, List, Optional, Any
 from uuid import UUID, uuid4
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, validator
 from sqlalchemy import Column, String, DateTime, Float, Integer, Boolean, Text, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID as PGUUID, JSONB
 from sqlalchemy.ext.declarative import declarative_base
@@ -113,6 +114,8 @@ class OptionContract(BaseModel):
         type_str = "C" if self.option_type == OptionType.CALL else "P"
         return f"{self.symbol}{exp_str}{type_str}{strike_str}"
 
+_expiration_of = attrgetter('expiration')
+
 class ClaudeDecision(BaseModel):
     """Claude AI decision for a position"""
     id: UUID = Field(default_factory=uuid4)
@@ -186,6 +189,13 @@ class OptionsPosition(BaseModel):
             return 0.0
         return (self.total_pnl / self.entry_cost) * 100
     
+    @property
+    def min_dte(self) -> int:
+        """Days until the nearest contract expiration"""
+        # Same as min(c.days_to_expiration ...) with a single date.today() call,
+        # and the expirations pulled by attrgetter rather than a generator
+        return (min(map(_expiration_of, self.contracts)) - date.today()).days
+    
     @property
     def days_held(self) -> int:
         """Days position has been held"""
@@ -202,8 +212,7 @@ class OptionsPosition(BaseModel):
             return True
         
         # Check if approaching expiration (7 days)
-        min_days_to_exp = min(c.days_to_expiration for c in self.contracts)
-        if min_days_to_exp <= 7:
+        if self.min_dte <= 7:
             return True
         
         # Check if it's been more than 24 hours
@@ -400,6 +409,8 @@ class TradingSessionDB(Base):
 
 class MarketAssessment(BaseModel):
     """Claude's market assessment"""
+    model_config = ConfigDict(frozen=True)
+    
     overall_sentiment: str
     volatility_environment: str = "normal"  # Default to avoid validation errors
     opportunity_quality: str = "moderate"   # Default to avoid validation errors  
@@ -407,6 +418,8 @@ class MarketAssessment(BaseModel):
 
 class CashStrategy(BaseModel):
     """Claude's cash management strategy"""
+    model_config = ConfigDict(frozen=True)
+    
     action: str
     reasoning: str
     target_cash_percentage: float
@@ -414,6 +427,8 @@ class CashStrategy(BaseModel):
 
 class EnhancedOptionsOpportunity(BaseModel):
     """Enhanced options opportunity with priority"""
+    model_config = ConfigDict(frozen=True)
+    
     symbol: str
     strategy_type: str
     contracts: List[Dict[str, Any]]
@@ -427,6 +442,8 @@ class EnhancedOptionsOpportunity(BaseModel):
 
 class MorningStrategyResponse(BaseModel):
     """Complete morning strategy response from Claude"""
+    model_config = ConfigDict(frozen=True)
+    
     market_assessment: MarketAssessment
     cash_strategy: CashStrategy
     opportunities: List[EnhancedOptionsOpportunity] 
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+On-disk cache for market data that is expensive to download and slow to change
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class FileCache:
+    """Pickle-per-key cache in a directory, with entries expiring by file age
+
+    Survives restarts, so a cold process doesn't re-download data it fetched
+    minutes ago. Failures to read or write are logged and treated as misses.
+    Files older than ttl are swept on the first write and then at most once
+    per ttl, so date-scoped keys don't accumulate.
+    """
+
+    def __init__(self, directory: str, ttl: float):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self._last_prune = 0.0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.md5(key.encode()).hexdigest()}.pkl"
+
+    def get(self, key: str, ttl: Optional[float] = None) -> Optional[Any]:
+        """Cached value for key, or None when missing or older than ttl seconds"""
+        path = self._path(key)
+        try:
+            if time.time() - path.stat().st_mtime >= (self.ttl if ttl is None else ttl):
+                return None
+            with path.open("rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️ Unreadable market cache entry {path.name}: {e}")
+            return None
+
+    def prune(self):
+        """Delete entries (and leftover temp files) older than the cache ttl"""
+        now = time.time()
+        self._last_prune = now
+        try:
+            paths = [*self.directory.glob("*.pkl"), *self.directory.glob("*.tmp")]
+        except OSError:
+            return
+        for path in paths:
+            try:
+                if now - path.stat().st_mtime >= self.ttl:
+                    path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"⚠️ Could not remove expired market cache entry {path.name}: {e}")
+
+    def set(self, key: str, value: Any):
+        """Store value for key, replacing the file atomically"""
+        if time.time() - self._last_prune >= self.ttl:
+            self.prune()
+        tmp_path = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except Exception as e:
+            logger.warning(f"⚠️ Could not write market cache entry for {key}: {e}")
+            if tmp_path:
+                Path(tmp_path).unlink(missing_ok=True)
@@ -4,30 +4,335 @@ Handles individual position conversations and strategic analysis
 """
 
 import asyncio
+import hashlib
 import json
 import logging
 import re
 import random
-from datetime import datetime, date
-from typing import Dict, List, Optional, Any, Tuple
-from uuid import UUID
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, date, timedelta, timezone
+from decimal import Decimal
+from functools import lru_cache
+from operator import attrgetter
+from types import MappingProxyType
+from typing import Deque, Dict, List, Optional, Any, Tuple
+from uuid import UUID, uuid4
 
 import httpx
-from anthropic import Anthropic, AsyncAnthropic
+import numpy as np
+import orjson
+from anthropic import (
+    Anthropic, AsyncAnthropic, RateLimitError, APIStatusError,
+    InternalServerError, APIConnectionError, APITimeoutError,
+)
 from anthropic.types import TextBlock, ToolUseBlock
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 from src.core.config import settings
+from src.core.http_client import get_http_client
 from src.models.options import (
     OptionsPosition, ClaudeDecision, ClaudeActionType, OptionContract,
     VolatilityData, GreeksData, PortfolioSummary, EnhancedOptionsOpportunity,
-    MorningStrategyResponse, MarketAssessment, CashStrategy
+    MorningStrategyResponse, MarketAssessment, CashStrategy, PerformanceHistory
 )
+from src.services.market_data_service import MarketDataService
 from src.utils.web_search import search_stock_data, WebSearchService
 from claude_summaries import claude_summary_manager
 
 logger = logging.getLogger(__name__)
 
+# Validates a whole opportunities list in one pass through pydantic-core
+_OPPORTUNITIES_ADAPTER = TypeAdapter(List[EnhancedOptionsOpportunity])
+
+# Top-level keys a live morning response must carry, plus their quoted byte
+# forms for a cheap presence check before the payload is parsed
+_LIVE_REQUIRED_KEYS = frozenset({'market_assessment', 'cash_strategy', 'opportunities'})
+_LIVE_REQUIRED_KEY_BYTES = tuple(f'"{key}"'.encode() for key in _LIVE_REQUIRED_KEYS)
+
+# Same for a position-advice reply
+_POSITION_REQUIRED_KEYS = frozenset({'action', 'confidence', 'reasoning', 'market_outlook',
+                                     'volatility_assessment', 'risk_assessment'})
+_POSITION_REQUIRED_KEY_BYTES = tuple(f'"{key}"'.encode() for key in _POSITION_REQUIRED_KEYS)
+# Everything from a position-advice reply that goes into its ClaudeDecision
+_POSITION_DECISION_KEYS = _POSITION_REQUIRED_KEYS | {'target_price', 'stop_loss', 'time_horizon'}
+
+# Outermost {...} span of a reply that may wrap its JSON in prose or fences
+_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+_JSON_BYTES_RE = re.compile(rb'\{.*\}', re.DOTALL)
+
+def _orjson_default(obj: Any) -> Any:
+    """Serialize the types orjson doesn't handle natively
+    
+    UUIDs, datetimes and enums are native, so callers pass them as-is
+    rather than coercing with str(), isoformat() or .value.
+    """
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    return str(obj)
+
+# Prompt JSON is compact unless DEBUG_PROMPTS asks for it to be readable;
+# indentation only adds bytes and tokens for Claude
+_PROMPT_JSON_OPTION = orjson.OPT_INDENT_2 if settings.DEBUG_PROMPTS else 0
+
+# Same switch for blocks serialized straight from a model by pydantic-core
+_PROMPT_JSON_INDENT = 2 if settings.DEBUG_PROMPTS else None
+
+def _dumps(obj: Any) -> str:
+    """orjson-backed stand-in for json.dumps when building prompt context"""
+    return orjson.dumps(obj, default=_orjson_default, option=_PROMPT_JSON_OPTION).decode()
+
+# A reply wrapped whole in a ```json ... ``` fence, capturing what's inside
+_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*(?P<body>.*?)\s*```\s*$', re.DOTALL)
+
+# Performance history fields shown to Claude, with the dict-valued
+# strategy_performance last so the rest can key a cache as-is
+_PERFORMANCE_HISTORY_FIELDS = (
+    'last_7_days_pnl', 'last_30_days_pnl', 'last_60_days_pnl', 'current_streak',
+    'consecutive_losses', 'days_since_last_win', 'recent_win_rate',
+    'performance_trend', 'risk_confidence', 'strategy_performance',
+)
+
+@lru_cache(maxsize=16)
+def _dump_performance_values(values: Tuple, strategy_performance: Tuple) -> str:
+    block = dict(zip(_PERFORMANCE_HISTORY_FIELDS, values))
+    block['strategy_performance'] = dict(strategy_performance)
+    return _dumps(block)
+
+def _dump_performance_history(history: PerformanceHistory) -> str:
+    """Serialized performance history, reused until any of its values change"""
+    values = tuple(getattr(history, field) for field in _PERFORMANCE_HISTORY_FIELDS[:-1])
+    return _dump_performance_values(values, tuple(history.strategy_performance.items()))
+
+# Portfolio fields copied verbatim into the morning and evening contexts
+_MORNING_PORTFOLIO_FIELDS = frozenset({
+    'total_value', 'cash_balance', 'open_positions', 'total_delta',
+    'total_vega', 'total_pnl', 'win_rate', 'max_drawdown',
+})
+_EVENING_PORTFOLIO_FIELDS = frozenset({'total_pnl', 'win_rate', 'open_positions'})
+
+def _risk_snapshot(portfolio: PortfolioSummary) -> Dict[str, Any]:
+    """The portfolio's derived risk figures, each computed once per context"""
+    return {
+        "current_risk_level": portfolio.get_adaptive_risk_level(),
+        "risk_adjusted_confidence": portfolio.risk_adjusted_confidence,
+        "suggested_position_size_multiplier": portfolio.suggested_position_size_multiplier,
+        "portfolio_utilization": portfolio.portfolio_utilization,
+    }
+
+# Position rows in the morning and evening contexts: the keys Claude sees and
+# a getter pulling the matching attributes off a position in one C-level call
+_MORNING_POSITION_KEYS = ('symbol', 'strategy', 'pnl', 'days_held')
+_MORNING_POSITION_FIELDS = attrgetter('symbol', 'strategy_type', 'pnl_percentage', 'days_held')
+_EVENING_POSITION_KEYS = ('symbol', 'pnl', 'status')
+_EVENING_POSITION_FIELDS = attrgetter('symbol', 'pnl_percentage', 'status')
+
+# Exit wording in a position-advice reply that isn't valid JSON
+_CLOSE_RE = re.compile(r'\b(?:close|sell|exit)\b', re.IGNORECASE)
+
+# Conversation threads are an LRU of at most this many positions, each holding
+# at most _THREAD_MAX_ENTRIES exchanges; a thread whose transcript grows past the
+# token budget has its older turns summarized
+_MAX_CONVERSATION_THREADS = 64
+_THREAD_MAX_ENTRIES = 8
+_THREAD_TOKEN_BUDGET = 4000
+_THREAD_KEEP_RECENT = 2
+
+# Last request-limit headers seen from the Claude API, used to hold off new
+# requests until the window resets instead of running into a 429
+_rate_limit_state: Dict[str, Any] = {"remaining": None, "reset": None}
+
+def _parse_reset(value: Optional[str]) -> Optional[datetime]:
+    """Parse an anthropic-ratelimit-*-reset RFC 3339 timestamp"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+async def _track_rate_limit_headers(response: httpx.Response):
+    """httpx response hook recording the remaining request budget for the Claude API"""
+    remaining = response.headers.get("anthropic-ratelimit-requests-remaining")
+    if remaining is None:
+        return
+    try:
+        _rate_limit_state["remaining"] = int(remaining)
+    except ValueError:
+        return
+    _rate_limit_state["reset"] = _parse_reset(response.headers.get("anthropic-ratelimit-requests-reset"))
+
+def _rate_limit_delay(headers) -> Optional[float]:
+    """Seconds to wait before retrying a 429, from Retry-After and the reset headers"""
+    delays = []
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            delays.append(float(retry_after))
+        except ValueError:
+            pass
+    now = datetime.now(timezone.utc)
+    for header in ("anthropic-ratelimit-requests-reset", "anthropic-ratelimit-tokens-reset"):
+        reset = _parse_reset(headers.get(header))
+        if reset:
+            delays.append((reset - now).total_seconds())
+    return max(delays) if delays else None
+
+# Transient failures worth backing off and retrying; anything else fails fast
+_RETRYABLE_ERRORS = (InternalServerError, APIConnectionError, APITimeoutError)
+_RETRYABLE_STATUS = frozenset({502, 503, 529})
+
+# Closes each symbol's block in the formatted research data
+_SYMBOL_SEPARATOR = "\n" + "=" * 50 + "\n\n"
+
+# Output token allowances for position analysis and the evening review
+# (position analysis offers up to 2 web searches, and the text around them counts)
+_INITIAL_ANALYSIS_MAX_TOKENS = 1024
+_FOLLOWUP_ANALYSIS_MAX_TOKENS = 1200
+_EVENING_FULL_REVIEW_POSITIONS = 5
+
+# Formatters for the per-symbol sections of the research data sent to Claude;
+# each appends its lines to parts
+def _format_price(parts: List[str], symbol: str, price_data: Dict[str, Any]):
+    get = price_data.get
+    market_cap = get('market_cap', 'N/A')
+    parts.extend((
+        f"📊 {symbol} PRICE DATA:\n",
+        f"   Current Price: ${get('current_price', 'N/A')} ({get('change_pct', 0):+.2f}%)\n",
+        f"   Volume: {get('volume', 0):,}\n",
+        f"   Market Cap: {f'${market_cap:,}' if market_cap != 'N/A' else market_cap}\n",
+        f"   P/E Ratio: {get('pe_ratio', 'N/A')}\n",
+    ))
+
+def _format_news(parts: List[str], symbol: str, news: List[Dict[str, Any]]):
+    parts.append(f"📰 {symbol} RECENT NEWS ({len(news)} articles):\n")
+    for i, article in enumerate(news[:3], 1):  # Show top 3 news
+        title = article.get('title', 'No title')
+        parts.append(f"   {i}. {title[:80]}{'...' if len(title) > 80 else ''}\n")
+
+def _format_earnings(parts: List[str], symbol: str, earnings: Dict[str, Any]):
+    get = earnings.get
+    parts.extend((
+        f"📅 {symbol} EARNINGS:\n",
+        f"   Next Earnings: {get('next_earnings_date', 'N/A')}\n",
+        f"   EPS Estimate: {get('earnings_estimate', 'N/A')}\n",
+        f"   Revenue Estimate: {get('revenue_estimate', 'N/A')}\n",
+    ))
+
+def _format_technical(parts: List[str], symbol: str, technical: Dict[str, Any]):
+    get = technical.get
+    rsi, sma_20, sma_10 = get('rsi', 'N/A'), get('sma_20', 'N/A'), get('sma_10', 'N/A')
+    parts.extend((
+        f"📈 {symbol} TECHNICAL ANALYSIS:\n",
+        f"   Trend: {get('trend', 'N/A')}\n",
+        f"   RSI: {f'{rsi:.1f}' if rsi != 'N/A' else rsi}\n",
+        f"   SMA 20: {f'${sma_20:.2f}' if sma_20 != 'N/A' else sma_20}\n",
+        f"   SMA 10: {f'${sma_10:.2f}' if sma_10 != 'N/A' else sma_10}\n",
+    ))
+
+def _format_sentiment(parts: List[str], symbol: str, sentiment: Dict[str, Any]):
+    confidence = sentiment.get('confidence', 'N/A')
+    parts.extend((
+        f"🎯 {symbol} MARKET SENTIMENT:\n",
+        f"   Sentiment: {sentiment.get('sentiment', 'N/A')}\n",
+        f"   Confidence: {f'{confidence:.1%}' if confidence != 'N/A' else confidence}\n",
+    ))
+
+_SECTIONS = (
+    ("price_data", _format_price),
+    ("news", _format_news),
+    ("earnings", _format_earnings),
+    ("technical_analysis", _format_technical),
+    ("market_sentiment", _format_sentiment),
+)
+
+# Successful per-symbol web research is reused for this long, so retried or
+# repeated morning sessions don't re-scrape the same symbols
+_RESEARCH_TTL_SECONDS = 120
+
+# Identical position-advice prompts, and repeat emergencies for an unchanged
+# position, reuse Claude's answer for this long instead of making another call
+_ADVICE_CACHE_TTL_SECONDS = 60
+_EMERGENCY_CACHE_TTL_SECONDS = 30
+_DECISION_CACHE_MAX_ENTRIES = 256
+
+# The morning session waits inline for its review batch, so however long
+# CLAUDE_BATCH_MAX_WAIT_SECONDS is set, the scheduler job is held at most this long
+_BATCH_REVIEW_WAIT_CAP_SECONDS = 180
+
+# Dividing a timedelta by this gives fractional hours
+_ONE_HOUR = timedelta(hours=1)
+
+# Below this many positions the plain Python loop beats numpy's setup cost
+_VECTORIZE_MIN_POSITIONS = 8
+
+def _days_held(positions: List, now: datetime) -> List[int]:
+    """Whole days each position has been held, 0 when entry_date is missing"""
+    if len(positions) < _VECTORIZE_MIN_POSITIONS:
+        return [(now - p.entry_date).days if p.entry_date else 0 for p in positions]
+    
+    entries = np.array(
+        [p.entry_date or np.datetime64('NaT') for p in positions],
+        dtype='datetime64[s]'
+    )
+    days = (np.datetime64(now, 's') - entries) // np.timedelta64(1, 'D')
+    return np.where(np.isnat(entries), 0, days).astype(np.int32).tolist()
+
+# Dashboard summaries are written by one background task so session methods
+# never block on the summary file; bursts are flushed in a single write
+_SUMMARY_BATCH_SIZE = 32
+_summary_queue: Optional[asyncio.Queue] = None
+_summary_writer: Optional[asyncio.Task] = None
+
+async def _summary_writer_loop(queue: asyncio.Queue):
+    """Drain queued summaries and hand them to the summary manager in batches"""
+    while True:
+        batch = [await queue.get()]
+        while not queue.empty() and len(batch) < _SUMMARY_BATCH_SIZE:
+            batch.append(queue.get_nowait())
+        try:
+            await asyncio.to_thread(claude_summary_manager.save_batch, batch)
+        except Exception as e:
+            logger.error("❌ Failed to write %s session summaries: %s", len(batch), e)
+        finally:
+            for _ in batch:
+                queue.task_done()
+
+def _queue_summary(kind: str, fields: Dict[str, Any]):
+    """Queue a session summary for the background writer, starting it if needed"""
+    global _summary_queue, _summary_writer
+    if (_summary_writer is None or _summary_writer.done()
+            or _summary_writer.get_loop() is not asyncio.get_running_loop()):
+        _summary_queue = asyncio.Queue()
+        _summary_writer = asyncio.create_task(_summary_writer_loop(_summary_queue))
+    _summary_queue.put_nowait((kind, fields))
+
+async def flush_summaries():
+    """Wait for queued summaries to be written, then stop the writer - call on shutdown"""
+    global _summary_queue, _summary_writer
+    if _summary_writer is not None and not _summary_writer.done():
+        await _summary_queue.join()
+        _summary_writer.cancel()
+        try:
+            await _summary_writer
+        except asyncio.CancelledError:
+            pass
+    _summary_queue = None
+    _summary_writer = None
+
+# Routes build a ClaudeService per request, so the fallback market data service
+# (and its HTTP session) is shared across instances, like the Claude HTTP pool
+_market_data: Optional[MarketDataService] = None
+
+async def close_market_data():
+    """Close the shared fallback market data service"""
+    global _market_data
+    if _market_data is not None:
+        await _market_data.close()
+        _market_data = None
+
 class ClaudeResponse(BaseModel):
     """Structured Claude response for options analysis"""
     action: ClaudeActionType
@@ -52,71 +357,524 @@ class OptionsOpportunity(BaseModel):
     max_risk: float
     time_horizon: int
 
+class InitialPick(BaseModel):
+    """Claude's pick and its entry/exit plan as submitted through submit_trading_plan"""
+    symbol: str
+    strategy_type: str
+    initial_confidence: float
+    rationale: str
+    reasoning: str = ""
+    time_horizon: str = ""
+    expected_move: str = ""
+    web_research_summary: str = ""
+    buy_under_price: Optional[float] = None
+    sell_over_price: Optional[float] = None
+    exit_date: Optional[str] = None
+
+# Schema Claude must echo back in the JSON format test
+_JSON_TEST_SCHEMA = """RESPONSE FORMAT: Return ONLY valid JSON object. No additional text or markdown.
+
+Schema:
+{
+  "status": "success",
+  "message": "JSON parsing test completed",
+  "confidence": 0.95,
+  "timestamp": "2024-01-29T10:00:00Z"
+}"""
+
+# Static instructions for the initial picks call, sent as the system prompt
+_INITIAL_PICKS_SYSTEM = """Search web for today's best stock picks and their current prices.
+
+Task: Web search 2-3 liquid stocks (AAPL,MSFT,GOOGL,NVDA,TSLA,SPY,QQQ) with strong setups.
+
+Using the current prices you found, provide for each pick:
+1. Buy under price (specific)
+2. Sell over price (specific)
+3. Exit date if neither hit
+
+Submit the plan by calling submit_trading_plan. Example picks:
+[{"symbol":"NVDA","strategy_type":"long_call","initial_confidence":0.75,"rationale":"Earnings beat + breakout","reasoning":"Web shows: earnings beat, technical breakout at $140","time_horizon":"3 weeks","expected_move":"bullish to $160","web_research_summary":"Searched: positive earnings, breakout pattern","buy_under_price":148.50,"sell_over_price":165,"exit_date":"2025-08-20"}]"""
+
+# Per-symbol review rubric for the morning review batch
+_BATCH_REVIEW_SYSTEM = """Review this options pick against the live data provided.
+
+JSON only:
+{"approve":true,"confidence":0.75,"buy_under_price":148.50,"sell_over_price":165,"exit_date":"2025-08-20","rationale":"Current price good for entry"}"""
+
+# Final-decision review rubric; the example reply doubles as the response schema
+_FINAL_DECISION_EXAMPLE_JSON = r'{"market_assessment":{"overall_sentiment":"bullish","recommended_exposure":"normal"},"cash_strategy":{"action":"DEPLOY","percentage":80,"reasoning":"Good setups"},"opportunities":[{"symbol":"NVDA","strategy_type":"long_call","confidence":0.75,"strike_price":145,"buy_under_price":148.50,"sell_over_price":165,"exit_date":"2025-08-20","rationale":"Current price good for entry","entry_criteria":"Buy if under $148.50","exit_criteria":"Sell at $165 or exit 2025-08-20"}]}'
+
+_FINAL_DECISION_SYSTEM = """Review current prices for every symbol in one response. For each pick, provide:
+1. Buy under price (specific)
+2. Sell over price (specific) 
+3. Exit date if neither hit
+
+JSON only:
+""" + _FINAL_DECISION_EXAMPLE_JSON
+
+# Position/evening/emergency prompt skeletons, filled with str.format_map per call
+_FOLLOWUP_POS_PROMPT = """Following up on our previous analysis of {symbol} position.
+
+Position Update:
+{position_update}
+
+Current Market Data:
+{market_update}
+
+Time Since Last Check: {time_since_last_check}
+
+Key Changes Since Last Analysis:
+{changes}
+
+RESPONSE FORMAT: Return ONLY valid JSON object. No additional text or markdown.
+
+Schema:
+{{
+  "action": "HOLD",
+  "confidence": 0.85,
+  "reasoning": "Detailed explanation for the decision...",
+  "market_outlook": "Bullish/Bearish/Neutral with reasoning",
+  "volatility_assessment": "Current IV analysis and expectations",
+  "risk_assessment": "Risk level and management considerations",
+  "target_price": 155.0,
+  "stop_loss": 145.0,
+  "time_horizon": 14
+}}
+
+Action options: HOLD, CLOSE, ADJUST_STOP, ADJUST_TARGET, ROLL_OPTION, ADD_POSITION
+
+Analysis Requirements:
+- Current P&L: {pnl:.1f}%
+- Days to expiration: {dte}
+- Time decay impact (theta)
+- Volatility changes
+- Portfolio risk impact"""
+
+_INITIAL_POS_PROMPT = """Initial analysis for new {symbol} options position.
+
+Position Details:
+{position_details}
+
+Market Analysis:
+{market_analysis}
+
+Portfolio Context:
+{portfolio_context}
+
+RESPONSE FORMAT: Return ONLY valid JSON object. No additional text or markdown.
+
+Schema:
+{{
+  "action": "HOLD",
+  "confidence": 0.85,
+  "reasoning": "Initial assessment of the position setup and market conditions...",
+  "market_outlook": "Bullish/Bearish/Neutral with reasoning",
+  "volatility_assessment": "Current IV analysis and expectations",
+  "risk_assessment": "Risk level and management plan",
+  "target_price": 155.0,
+  "stop_loss": 145.0,
+  "time_horizon": 14
+}}
+
+Action options: HOLD, CLOSE, ADJUST_STOP, ADJUST_TARGET, ROLL_OPTION
+
+Analysis Requirements:
+- Initial risk assessment and Greeks impact
+- Target exit strategy and key levels
+- Timeline for next check-in
+- How position fits within portfolio limits"""
+
+_EVENING_PROMPT = """🌆 END-OF-DAY PORTFOLIO REVIEW WITH WEB SEARCH ANALYSIS
+
+You are an expert options trader with access to comprehensive web search capabilities.
+You MUST search multiple websites and sources to provide thorough end-of-day analysis.
+
+WEB SEARCH REQUIREMENTS FOR EVENING REVIEW:
+- Search for after-hours market news and earnings announcements
+- Research tomorrow's market catalysts and economic events
+- Check for any breaking news affecting your positions
+- Research sector performance and rotation trends
+- Look for options flow data and unusual activity
+- Search for analyst ratings changes and price target updates
+- Research market sentiment and volatility expectations
+
+Today's Session (performance, positions, trades executed today, market summary):
+{session}
+
+Portfolio Greeks Summary:
+- Delta: {total_delta}
+- Gamma: {total_gamma}
+- Theta: {total_theta} (daily decay)
+- Vega: {total_vega}
+
+WEB SEARCH ANALYSIS PROCESS:
+1. Search for "after hours market news today"
+2. Research each position: "[SYMBOL] after hours news earnings"
+3. Check tomorrow's calendar: "market events tomorrow earnings"
+4. Research sector trends: "sector rotation today market"
+5. Look for options flow: "unusual options activity today"
+6. Check analyst updates: "analyst ratings changes today"
+
+Please provide comprehensive analysis including:
+1. Performance attribution analysis (what drove P&L) with web research context
+2. Risk assessment of current portfolio based on market conditions
+3. Positions requiring attention tomorrow
+4. Strategy adjustments for tomorrow
+5. Market outlook for next trading session
+6. Lessons learned from today's trading
+
+Focus on:
+- Greeks management and risk exposure
+- Upcoming expirations and time decay
+- Volatility changes and their impact
+- Position adjustments needed"""
+
+_EMERGENCY_PROMPT = """EMERGENCY POSITION ANALYSIS
+
+Trigger: {trigger}
+
+Position Status:
+{position}
+
+Market Conditions:
+{market}
+
+URGENT: This position requires immediate attention.
+
+Current P&L: {pnl:.1f}%
+Days to expiration: {dte}
+
+Provide immediate recommendation:
+1. HOLD - Position is still viable
+2. CLOSE - Exit immediately
+3. ADJUST - Modify position parameters
+4. HEDGE - Add protective position
+
+Consider:
+- Risk of further losses
+- Time decay acceleration
+- Volatility impact
+- Liquidity for exit
+
+This is time-sensitive. Provide clear, actionable guidance."""
+
+_LIVE_MARKET_HEADER = """
+REAL-TIME MARKET DATA:
+• SPY: ${spy_price} ({spy_change:+.2f}%)
+• QQQ: ${qqq_price} ({qqq_change:+.2f}%)
+• VIX: {vix} ({vix_change:+.2f}%)
+• Dollar Index: {dollar_index}
+
+MARKET SENTIMENT: {market_sentiment}
+VOLATILITY TREND: {volatility_trend}
+MARKET HOURS: {market_hours}
+DATA SOURCE: {data_source}
+
+SECTOR PERFORMANCE (Live ETF Data):"""
+
+# Values the live market header falls back to for fields the feed didn't supply
+_LIVE_MARKET_DEFAULTS = {
+    'spy_price': 'N/A', 'spy_change': 0, 'qqq_price': 'N/A', 'qqq_change': 0,
+    'vix': 'N/A', 'vix_change': 0, 'dollar_index': 'N/A',
+    'market_sentiment': 'Unknown', 'volatility_trend': 'Unknown', 'data_source': 'Live',
+}
+
+# Structured evening review sections; the free-text summary is all Claude's
+# reply provides today, so every review shares these read-only empties
+_EVENING_REVIEW_SHELL = MappingProxyType({
+    "performance_attribution": MappingProxyType({}),
+    "risk_assessment": MappingProxyType({}),
+    "tomorrow_strategy": MappingProxyType({}),
+    "lessons_learned": (),
+})
+
+# Conservative response used whenever a morning reply can't be parsed; the
+# models are frozen, so one instance is shared by every failure
+_FALLBACK_MORNING_RESPONSE = MorningStrategyResponse(
+    market_assessment=MarketAssessment(
+        overall_sentiment="uncertain",
+        volatility_environment="elevated",
+        opportunity_quality="poor",
+        recommended_exposure="minimal"
+    ),
+    cash_strategy=CashStrategy(
+        action="hold_cash",
+        reasoning="Unable to parse Claude response - holding cash for safety",
+        target_cash_percentage=90.0,
+        urgency="high"
+    ),
+    opportunities=[]
+)
+
+# Fallback pick pools - ETFs for the conservative approach, individual stocks for aggressive
+_FALLBACK_LIQUID_SYMBOLS = ("SPY", "QQQ", "IWM", "AAPL", "MSFT", "NVDA", "GOOGL", "TSLA")
+_FALLBACK_CONSERVATIVE_SYMBOLS = ("SPY", "QQQ", "IWM")
+_FALLBACK_AGGRESSIVE_SYMBOLS = ("AAPL", "MSFT", "NVDA", "GOOGL", "TSLA")
+_FALLBACK_CONSERVATIVE_STRATEGIES = ("iron_condor", "cash_secure_put", "covered_call")
+_FALLBACK_AGGRESSIVE_STRATEGIES = ("long_call", "long_put", "straddle", "call_spread")
+_FALLBACK_NORMAL_STRATEGIES = ("iron_condor", "call_spread", "put_spread", "long_call")
+_FALLBACK_POOLS = {
+    "conservative": (_FALLBACK_CONSERVATIVE_SYMBOLS, _FALLBACK_CONSERVATIVE_STRATEGIES),
+    "aggressive": (_FALLBACK_AGGRESSIVE_SYMBOLS, _FALLBACK_AGGRESSIVE_STRATEGIES),
+    "normal": (_FALLBACK_LIQUID_SYMBOLS, _FALLBACK_NORMAL_STRATEGIES),
+}
+
+@lru_cache(maxsize=32)
+def _compute_fallback_picks(date_ordinal: int, risk_level: str, current_streak: int) -> Tuple[Dict[str, Any], ...]:
+    """Dynamic fallback picks - a pure function of the day, risk level and streak
+    
+    Cached, so treat the returned dicts as read-only.
+    """
+    # Time-based rotation to vary picks
+    day_of_year = date.fromordinal(date_ordinal).timetuple().tm_yday
+    rotation_index = day_of_year % len(_FALLBACK_LIQUID_SYMBOLS)
+    symbol_pool, strategies = _FALLBACK_POOLS.get(risk_level, _FALLBACK_POOLS["normal"])
+    
+    # Pick 1-2 symbols based on performance
+    num_picks = 2 if current_streak > 2 else 1
+    selected_symbols = [symbol_pool[(rotation_index + i) % len(symbol_pool)]
+                        for i in range(min(num_picks, len(symbol_pool)))]
+    
+    picks = []
+    for symbol in selected_symbols:
+        # Strategy selection based on streak and symbol type
+        if current_streak >= 3:
+            strategy = "long_call" if symbol in _FALLBACK_AGGRESSIVE_SYMBOLS else "call_spread"
+        elif current_streak <= -2:
+            strategy = "cash_secure_put" if symbol in _FALLBACK_CONSERVATIVE_SYMBOLS else "put_spread"
+        else:
+            strategy = strategies[rotation_index % len(strategies)]
+        
+        picks.append({
+            "symbol": symbol,
+            "strategy_type": strategy,
+            "initial_confidence": 0.75 if current_streak > 0 else 0.72,
+            "rationale": f"Dynamic fallback for {symbol} - {strategy} strategy based on {risk_level} risk profile and {current_streak} streak",
+            "reasoning": f"Systematic rotation pick: Day {day_of_year} rotation, {risk_level} risk, suitable for current portfolio state",
+            "time_horizon": "2-3 weeks",
+            "expected_move": "based on technical analysis and market sentiment",
+            "web_research_summary": f"Dynamic fallback rotation - {symbol} selected for {strategy} based on risk profile"
+        })
+    return tuple(picks)
+
+_BATCH_REVIEW_PROMPT_PREFIX = "Pick and its live data: "
+
+# Strategies a pick may use to go on to the live data search
+_VALID_STRATEGIES = frozenset({
+    'long_call', 'long_put', 'call_spread', 'put_spread', 'iron_condor',
+    'straddle', 'strangle', 'covered_call', 'protective_put'
+})
+
+def _is_valid_recommendation(rec: Any) -> bool:
+    """Check a pick has the structure needed for the live data search"""
+    if not isinstance(rec, dict):
+        return False
+    symbol = rec.get('symbol')
+    confidence = rec.get('initial_confidence')
+    return (
+        isinstance(symbol, str) and bool(symbol.strip())
+        and rec.get('strategy_type') in _VALID_STRATEGIES
+        and isinstance(confidence, (int, float)) and 0 <= confidence <= 1
+    )
+
+def _filter_valid(recs: List[Any]) -> List[Dict[str, Any]]:
+    """Keep the well-formed picks, logging the rejects once"""
+    valid = [rec for rec in recs if _is_valid_recommendation(rec)]
+    if len(valid) != len(recs):
+        invalid = [rec for rec in recs if not _is_valid_recommendation(rec)]
+        logger.warning("⚠️ Dropped %s invalid recommendations: %s", len(invalid), invalid)
+    return valid
+
+def _pick_to_opportunity(pick: Dict[str, Any], default_rationale: str = 'Claude initial pick',
+                         trusted: bool = False) -> EnhancedOptionsOpportunity:
+    """Convert an initial (or fallback) pick into the opportunity shape MorningStrategyResponse expects
+    
+    trusted picks are our own fallback picks and skip validation.
+    """
+    rationale = pick.get('rationale', default_rationale)
+    buy_under, sell_over = pick.get('buy_under_price'), pick.get('sell_over_price')
+    if isinstance(buy_under, (int, float)) and isinstance(sell_over, (int, float)):
+        rationale = f"{rationale} | Plan: buy under ${buy_under:.2f}, sell over ${sell_over:.2f}"
+        if pick.get('exit_date'):
+            rationale = f"{rationale}, exit by {pick['exit_date']}"
+    
+    fields = dict(
+        symbol=pick.get('symbol', ''),
+        strategy_type=pick.get('strategy_type', 'long_call'),
+        confidence=pick.get('initial_confidence', 0.7),
+        rationale=rationale,
+        risk_assessment='Moderate risk',
+        time_horizon=21,  # 3 weeks in days
+        target_return=1500.0,
+        max_risk=1000.0,
+        contracts=[],
+        priority='Normal'
+    )
+    if trusted:
+        return EnhancedOptionsOpportunity.model_construct(**fields)
+    return EnhancedOptionsOpportunity.model_validate(fields)
+
+def _pick_defaults(picks: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-symbol opportunity fields taken from the picks, for reviews that omit them"""
+    return {pick.get('symbol', ''): {
+        "strategy_type": pick.get('strategy_type', 'long_call'),
+        "confidence": pick.get('initial_confidence', 0.7),
+        "rationale": pick.get('rationale', 'Claude initial pick'),
+        "risk_assessment": 'Moderate risk',
+        "time_horizon": 21,  # 3 weeks in days
+        "target_return": 1500.0,
+        "max_risk": 1000.0,
+        "contracts": []
+    } for pick in picks}
+
+# Claude is asked for 2-3 picks; once this many valid ones have streamed in
+# the rest of the generation is not needed
+_MAX_INITIAL_PICKS = 3
+
+class _PickStreamScanner:
+    """Pulls complete JSON objects carrying a "symbol" key out of streamed text
+    
+    Tracks string state and brace nesting across chunks so each object can be
+    parsed as soon as its closing brace arrives.
+    """
+    
+    def __init__(self):
+        self.text = ""
+        self.starts: List[int] = []
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        found = []
+        offset = len(self.text)
+        self.text += chunk
+        for i, ch in enumerate(chunk, offset):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == '\\':
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == '{':
+                self.starts.append(i)
+            elif ch == '}' and self.starts:
+                start = self.starts.pop()
+                span = self.text[start:i + 1]
+                # Nested objects inside a pick close first; only spans that can
+                # hold a pick are worth parsing
+                if '"symbol"' not in span:
+                    continue
+                try:
+                    obj = orjson.loads(span)
+                except orjson.JSONDecodeError:
+                    continue
+                if isinstance(obj, dict) and 'symbol' in obj:
+                    found.append(obj)
+        return found
+
+# Client tool Claude calls with its picks so they arrive as parsed JSON
+_SUBMIT_PLAN_TOOL = {
+    "name": "submit_trading_plan",
+    "description": "Submit today's trading picks with entry and exit prices after researching current prices",
+    "input_schema": {
+        "type": "object",
+        "properties": {"picks": {"type": "array", "items": InitialPick.model_json_schema()}},
+        "required": ["picks"]
+    }
+}
+
 class ClaudeService:
     """Claude AI service for options trading analysis"""
     
     def __init__(self):
-        self.client = AsyncAnthropic(api_key=settings.CLAUDE_API_KEY)
+        self._http = get_http_client()
+        if _track_rate_limit_headers not in self._http.event_hooks["response"]:
+            self._http.event_hooks["response"].append(_track_rate_limit_headers)
+        self.client = AsyncAnthropic(api_key=settings.CLAUDE_API_KEY, http_client=self._http)
         self.model = settings.CLAUDE_MODEL
         self.max_tokens = 2000
+        self.temperature = settings.CLAUDE_TEMPERATURE  # Every call that asks for JSON
         self.daily_query_count = 0
-        self.conversation_threads: Dict[str, List[Dict]] = {}
+        # Query limits read once - settings attribute access isn't free on every call
+        self._max_daily_queries = int(settings.CLAUDE_MAX_DAILY_QUERIES)
+        self._emergency_reserve = self._max_daily_queries - 2  # Last 2 queries kept for emergencies
+        self.conversation_threads: "OrderedDict[str, Deque[Dict]]" = OrderedDict()
         self.max_retries = 2  # Reduced from 3 to avoid rate limit escalation
         self.base_delay = 5.0  # Increased from 2.0 to respect rate limits
         self.max_delay = 60.0  # Increased for 429 errors
+        self._research_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._research_locks: Dict[str, asyncio.Lock] = {}
+        self._query_lock = asyncio.Lock()  # Guards daily_query_count across concurrent calls
+        self._decision_cache: Dict[Any, Tuple[float, Any]] = {}
     
-    def _extract_text_from_response(self, response) -> str:
-        """Safely extract text from Claude response, handling both text and tool use blocks"""
+    async def _ensure_market_data(self) -> MarketDataService:
+        """Get the shared market data service, initializing it on first use"""
+        global _market_data
+        if _market_data is None:
+            _market_data = MarketDataService()
+            await _market_data.initialize()
+        return _market_data
+    
+    async def _reserve_query(self, limit: Optional[int] = None) -> bool:
+        """Claim one of today's Claude queries before making the call
+        
+        The limit check and the increment happen together under a lock, so
+        concurrent analyses can't all pass the check before any of them counts.
+        limit defaults to the daily maximum.
+        """
+        async with self._query_lock:
+            if self.daily_query_count >= (self._max_daily_queries if limit is None else limit):
+                return False
+            self.daily_query_count += 1
+            return True
+    
+    async def _refund_query(self):
+        """Give back a reserved query whose call never completed"""
+        async with self._query_lock:
+            self.daily_query_count = max(0, self.daily_query_count - 1)
+    
+    def _split_response_blocks(self, response) -> Tuple[str, List[ToolUseBlock]]:
+        """Split a Claude response into its joined text and any client tool calls
+        
+        Server tool blocks (web search calls and results) are skipped.
+        """
         try:
-            # Handle multiple content blocks
             text_parts = []
             tool_blocks = []
             
             for block in response.content:
-                if hasattr(block, 'text') and block.text:
-                    # This is a TextBlock with actual content
-                    text_parts.append(block.text)
-                elif hasattr(block, 'type') and block.type == 'tool_use':
-                    # This is a ToolUseBlock - Claude used a tool
+                if isinstance(block, TextBlock):
+                    if block.text:
+                        text_parts.append(block.text)
+                elif isinstance(block, ToolUseBlock):
                     tool_blocks.append(block)
-                    logger.info(f"🔧 Claude used tool: {getattr(block, 'name', 'unknown')}")
+                    logger.info("🔧 Claude used tool: %s", block.name)
+            
+            text = "\n".join(text_parts).strip()
+            if not text:
+                if tool_blocks:
+                    logger.warning("⚠️ Claude used %s tools but provided no text response", len(tool_blocks))
                 else:
-                    # Try to extract any text content from unknown block types
-                    block_str = str(block)
-                    if len(block_str) > 50 and not block_str.startswith('<'):
-                        text_parts.append(block_str)
-            
-            # If we have text content, use it
-            if text_parts:
-                combined_text = "\n".join(text_parts).strip()
-                if combined_text:
-                    return combined_text
-            
-            # If no text but we have tool blocks, Claude probably used tools without providing text
-            if tool_blocks and not text_parts:
-                logger.warning(f"⚠️ Claude used {len(tool_blocks)} tools but provided no text response")
-                return ""
-            
-            # Final fallback - try to get any content
-            logger.warning("⚠️ No text content found in Claude response")
-            return ""
+                    logger.warning("⚠️ No text content found in Claude response")
+            return text, tool_blocks
             
         except Exception as e:
-            logger.error(f"❌ Failed to extract text from Claude response: {e}")
-            logger.error(f"Response content types: {[type(block) for block in response.content] if hasattr(response, 'content') else 'No content'}")
-            
-            # Enhanced fallback
-            try:
-                if hasattr(response, 'content') and response.content:
-                    first_block = response.content[0]
-                    if hasattr(first_block, 'text'):
-                        return first_block.text
-                    else:
-                        logger.error(f"First block type: {type(first_block)}, attributes: {dir(first_block)}")
-                return ""
-            except Exception as fallback_error:
-                logger.error(f"❌ Fallback extraction also failed: {fallback_error}")
-                return ""
+            logger.error("❌ Failed to extract text from Claude response: %s", e)
+            return "", []
+    
+    def _extract_text_from_response(self, response) -> str:
+        """Safely extract text from Claude response, ignoring tool use blocks"""
+        return self._split_response_blocks(response)[0]
+    
+    def _extract_text_fast(self, response) -> str:
+        """Text of a response to a call made without tools - a single text block, no walk needed"""
+        content = response.content
+        if content and isinstance(content[0], TextBlock):
+            return content[0].text.strip()
+        return self._extract_text_from_response(response)
     
     async def _retry_claude_request(self, request_func, request_name: str, *args, **kwargs):
         """Retry Claude API requests with exponential backoff"""
@@ -124,23 +882,47 @@ class ClaudeService:
         
         for attempt in range(self.max_retries + 1):
             try:
-                logger.info(f"🤖 {request_name} - Attempt {attempt + 1}/{self.max_retries + 1}")
+                # Hold off when the last response said the request budget is spent
+                reset = _rate_limit_state["reset"]
+                if _rate_limit_state["remaining"] == 0 and reset:
+                    wait = (reset - datetime.now(timezone.utc)).total_seconds()
+                    if wait > 0:
+                        logger.info("⏳ Claude request budget exhausted - waiting %.1fs for %s", wait, request_name)
+                        await asyncio.sleep(wait)
+                
+                logger.info("🤖 %s - Attempt %s/%s", request_name, attempt + 1, self.max_retries + 1)
                 
                 # Make the API request
                 response = await request_func(*args, **kwargs)
                 
-                logger.info(f"✅ {request_name} successful on attempt {attempt + 1}")
+                logger.info("✅ %s successful on attempt %s", request_name, attempt + 1)
                 return response
                 
+            except RateLimitError as e:
+                last_exception = e
+                if attempt >= self.max_retries:
+                    logger.error("❌ Rate limit - retries exhausted for %s", request_name)
+                    break
+                
+                # Wait exactly as long as the API asks; only guess when it doesn't say
+                delay = _rate_limit_delay(e.response.headers)
+                if delay is None:
+                    delay = 30.0 + random.uniform(0, 10)
+                delay = max(delay, 0.0)
+                logger.warning("⚠️ Rate limit hit for %s - waiting %.1fs", request_name, delay)
+                await asyncio.sleep(delay)
+                continue
+                
             except Exception as e:
                 last_exception = e
-                error_str = str(e).lower()
                 
-                # Check if this is a retryable error
+                # Check if this is a retryable error by type, not by message text
                 retryable = False
                 delay = 0
                 
-                if any(code in error_str for code in ['500', '502', '503', '529', 'overloaded']):
+                if isinstance(e, _RETRYABLE_ERRORS) or (
+                    isinstance(e, APIStatusError) and e.status_code in _RETRYABLE_STATUS
+                ):
                     if attempt < self.max_retries:
                         # Calculate delay with exponential backoff + jitter
                         delay = min(
@@ -148,24 +930,15 @@ class ClaudeService:
                             self.max_delay
                         )
                         retryable = True
-                elif '429' in error_str or 'rate_limit' in error_str:
-                    # Special handling for rate limits - longer delays, fewer retries
-                    if attempt < 1:  # Only retry once for rate limits
-                        delay = 30.0 + random.uniform(0, 10)  # 30-40 second wait
-                        logger.warning(f"⚠️ Rate limit hit for {request_name} - waiting {delay:.0f}s")
-                        retryable = True
-                    else:
-                        logger.error(f"❌ Rate limit - not retrying {request_name} to avoid escalation")
-                        break
                 
                 if retryable:
-                    logger.warning(f"⚠️ {request_name} failed (attempt {attempt + 1}): {e}")
-                    logger.info(f"⏳ Waiting {delay:.1f}s before retry...")
+                    logger.warning("⚠️ %s failed (attempt %s): %s", request_name, attempt + 1, e)
+                    logger.info("⏳ Waiting %.1fs before retry...", delay)
                     await asyncio.sleep(delay)
                     continue
                 else:
                     # Non-retryable error, fail immediately
-                    logger.error(f"❌ {request_name} failed with non-retryable error: {e}")
+                    logger.error("❌ %s failed with non-retryable error: %s", request_name, e)
                     break
         
         # If we get here, all retries failed
@@ -188,31 +961,21 @@ class ClaudeService:
             )
             return True
         except Exception as e:
-            logger.error(f"Claude health check failed after retries: {e}")
+            logger.error("Claude health check failed after retries: %s", e)
             return False
     
     async def test_json_response(self) -> Dict[str, Any]:
         """Test that Claude returns proper JSON format"""
         try:
-            prompt = """
-            RESPONSE FORMAT: Return ONLY valid JSON object. No additional text or markdown.
-            
-            Schema:
-            {
-              "status": "success",
-              "message": "JSON parsing test completed",
-              "confidence": 0.95,
-              "timestamp": "2024-01-29T10:00:00Z"
-            }
-            
-            Return a JSON object following this exact schema.
-            """
+            prompt = "Return a JSON object following this exact schema."
             
             # Use retry mechanism for Claude API call
             async def make_request():
                 return await self.client.messages.create(
                 model=self.model,
                 max_tokens=200,
+                temperature=self.temperature,
+                system=_JSON_TEST_SCHEMA,
                 messages=[{"role": "user", "content": prompt}]
                 )
             
@@ -222,7 +985,7 @@ class ClaudeService:
             )
             
             # Test parsing
-            response_text = self._extract_text_from_response(response)
+            response_text = self._extract_text_fast(response)
             cleaned = response_text.strip()
             if cleaned.startswith('```json'):
                 cleaned = cleaned[7:]
@@ -230,7 +993,7 @@ class ClaudeService:
                 cleaned = cleaned[:-3]
             cleaned = cleaned.strip()
             
-            parsed_data = json.loads(cleaned)
+            parsed_data = orjson.loads(cleaned)
             
             return {
                 "success": True,
@@ -279,20 +1042,8 @@ class ClaudeService:
                 
                 # Skip the second Claude call to avoid rate limits when using fallback
                 logger.info("🔄 Using fallback picks - skipping second Claude call to prevent rate limits")
-                opportunities = []
-                for pick in initial_recommendations:
-                                    opportunities.append(EnhancedOptionsOpportunity(
-                    symbol=pick.get('symbol', ''),
-                    strategy_type=pick.get('strategy_type', 'long_call'),
-                    confidence=pick.get('initial_confidence', 0.7),
-                    rationale=pick.get('rationale', 'Fallback pick'),
-                    risk_assessment='Moderate risk',
-                    time_horizon=21,  # 3 weeks in days
-                    target_return=1500.0,
-                    max_risk=1000.0,
-                    contracts=[],
-                    priority='Normal'
-                ))
+                opportunities = [_pick_to_opportunity(pick, 'Fallback pick', trusted=True)
+                                 for pick in initial_recommendations]
                 
                 return MorningStrategyResponse(
                     market_assessment=MarketAssessment(
@@ -317,38 +1068,38 @@ class ClaudeService:
                 if symbol and len(symbol) <= 10:  # Valid stock symbol length
                     recommended_symbols.append(symbol)
                 else:
-                    logger.warning(f"⚠️ Invalid symbol from Claude: {symbol}")
+                    logger.warning("⚠️ Invalid symbol from Claude: %s", symbol)
             
             if not recommended_symbols:
                 logger.error("❌ No valid symbols from Claude's autonomous picks")
                 return self._create_fallback_response()
             
-            logger.info(f"📊 Claude autonomously picked symbols: {recommended_symbols}")
-            
-            # STEP 2: Get live market data for Claude's autonomous picks only
-            logger.info("🔍 Step 2: Searching live data for Claude's autonomous stock picks...")
-            live_market_data = await self._search_live_data_for_symbols(recommended_symbols)
-            
-            if not live_market_data:
-                logger.warning("⚠️ No live market data found for Claude's picks")
-            
-            # STEP 3: Skip second Claude call to prevent rate limits - use initial picks directly
-            logger.info("🔄 Step 3: Converting initial picks to final format (avoiding second Claude call for rate limits)")
-            
-            opportunities = []
-            for pick in initial_recommendations:
-                opportunities.append(OptionsOpportunity(
-                    symbol=pick.get('symbol', ''),
-                    strategy_type=pick.get('strategy_type', 'long_call'),
-                    confidence=pick.get('initial_confidence', 0.7),
-                    rationale=pick.get('rationale', 'Claude initial pick'),
-                    risk_assessment='Moderate risk',
-                    time_horizon=21,  # 3 weeks in days
-                    target_return=1500.0,
-                    max_risk=1000.0,
-                    contracts=[],
-                    priority='Normal'
-                ))
+            logger.info("📊 Claude autonomously picked symbols: %s", recommended_symbols)
+            
+            # Claude normally researches live prices during the picks call and
+            # returns entry/exit rules with each pick, which makes steps 2 and 3
+            # redundant. They only run for picks without a complete plan (fallback picks)
+            if all(rec.get('buy_under_price') is not None and rec.get('sell_over_price') is not None
+                   for rec in initial_recommendations):
+                logger.info("🎯 Claude's picks include live-price entry/exit rules - skipping separate live data review")
+            else:
+                # STEP 2: Get live market data for Claude's autonomous picks only
+                logger.info("🔍 Step 2: Searching live data for Claude's autonomous stock picks...")
+                live_market_data = await self._search_live_data_for_symbols(recommended_symbols)
+                
+                if not live_market_data:
+                    logger.warning("⚠️ No live market data found for Claude's picks")
+                
+                # STEP 3: Per-symbol review through the batch API when enabled. Batches
+                # run outside the synchronous rate limits; otherwise use initial picks directly
+                if settings.CLAUDE_BATCH_REVIEW_ENABLED:
+                    logger.info("📦 Step 3: Submitting per-symbol review of Claude's picks as a message batch")
+                    reviews = await self._submit_batch_analysis(initial_recommendations, live_market_data)
+                    initial_recommendations = self._apply_batch_reviews(initial_recommendations, reviews)
+                else:
+                    logger.info("🔄 Step 3: Converting initial picks to final format (avoiding second Claude call for rate limits)")
+            
+            opportunities = [_pick_to_opportunity(pick) for pick in initial_recommendations]
             
             final_strategy_response = MorningStrategyResponse(
                 market_assessment=MarketAssessment(
@@ -368,14 +1119,14 @@ class ClaudeService:
             
             if final_strategy_response:
                 num_opportunities = len(final_strategy_response.opportunities)
-                logger.info(f"🎯 Claude's final autonomous decision: {num_opportunities} confirmed opportunities")
+                logger.info("🎯 Claude's final autonomous decision: %s confirmed opportunities", num_opportunities)
                 
                 # Log Claude's autonomous analysis
                 if hasattr(final_strategy_response, 'market_assessment'):
                     assessment = final_strategy_response.market_assessment
-                    logger.info(f"📊 Claude's market sentiment: {assessment.overall_sentiment}")
+                    logger.info("📊 Claude's market sentiment: %s", assessment.overall_sentiment)
                     if hasattr(assessment, 'key_observations'):
-                        logger.info(f"📊 Claude's key observations: {assessment.key_observations}")
+                        logger.info("📊 Claude's key observations: %s", assessment.key_observations)
                 
                 # Generate and save morning summary for dashboard
                 await self._generate_and_save_morning_summary(final_strategy_response, portfolio, market_data)
@@ -385,24 +1136,24 @@ class ClaudeService:
                 logger.warning("⚠️ Claude changed mind after reviewing live data - no final picks")
                 # Save fallback summary
                 try:
-                    claude_summary_manager.save_morning_summary(
-                        summary="No trades today - Claude reviewed live data and decided to hold cash",
-                        opportunities_count=0,
-                        market_analysis="Cautious approach after live data review"
-                    )
+                    _queue_summary("morning", {
+                        "summary": "No trades today - Claude reviewed live data and decided to hold cash",
+                        "opportunities_count": 0,
+                        "market_analysis": "Cautious approach after live data review"
+                    })
                 except:
                     pass
                 return self._create_fallback_response()
                 
         except Exception as e:
-            logger.error(f"❌ Claude autonomous trading process failed: {e}")
+            logger.error("❌ Claude autonomous trading process failed: %s", e)
             # Save fallback summary for error case
             try:
-                claude_summary_manager.save_morning_summary(
-                    summary="Morning session error - system will retry next morning",
-                    opportunities_count=0,
-                    market_analysis="Technical error during analysis"
-                )
+                _queue_summary("morning", {
+                    "summary": "Morning session error - system will retry next morning",
+                    "opportunities_count": 0,
+                    "market_analysis": "Technical error during analysis"
+                })
             except:
                 pass
             return self._create_fallback_response()
@@ -411,137 +1162,169 @@ class ClaudeService:
         """Step 1: Claude autonomously picks stocks/options using built-in web search tool"""
         try:
             current_symbols = [p.symbol for p in current_positions]
-            # Fix f-string formatting issue by using regular string concatenation
-            prompt = f"""Search web for today's best stock picks. Avoid: {current_symbols}
-
-Portfolio: ${portfolio.cash_balance:,.0f} cash, {portfolio.performance_history.current_streak} streak
-
-Task: Web search 2-3 liquid stocks (AAPL,MSFT,GOOGL,NVDA,TSLA,SPY,QQQ) with strong setups.
+            # Only the portfolio specifics change between calls; the static
+            # instructions go in the system prompt
+            prompt = f"""Avoid: {current_symbols}
 
-Return JSON only:""" + """
-[{"symbol":"NVDA","strategy_type":"long_call","initial_confidence":0.75,"rationale":"Earnings beat + breakout","reasoning":"Web shows: earnings beat, technical breakout at $140","time_horizon":"3 weeks","expected_move":"bullish to $160","web_research_summary":"Searched: positive earnings, breakout pattern"}]"""
+Portfolio: ${portfolio.cash_balance:,.0f} cash, {portfolio.performance_history.current_streak} streak"""
             
-            # Use retry mechanism for Claude API call (REDUCED TOKENS)
+            # Use retry mechanism for Claude API call (REDUCED TOKENS). The reply is
+            # streamed and picks are validated as they complete, so generation can
+            # be cut off as soon as enough valid picks are in
             async def make_request():
-                return await self.client.messages.create(
+                scanner = None
+                streamed_picks = []
+                async with self.client.messages.stream(
                 model=self.model,
-                    max_tokens=400,  # Drastically reduced from 2000
-                temperature=0.4,
-                    tools=[{"type": "web_search_20250305", "name": "web_search", "max_uses": 3}],  # Reduced searches
+                    max_tokens=600,  # Room for the entry/exit plan alongside each pick
+                temperature=self.temperature,
+                    tools=[{"type": "web_search_20250305", "name": "web_search", "max_uses": 3}, _SUBMIT_PLAN_TOOL],  # Reduced searches
+                system=_INITIAL_PICKS_SYSTEM,
                 messages=[{"role": "user", "content": prompt}]
-            )
-            
-            response = await self._retry_claude_request(
+                ) as stream:
+                    async for event in stream:
+                        if event.type == "content_block_start":
+                            scanner = _PickStreamScanner()
+                            continue
+                        if event.type == "text":
+                            chunk = event.text
+                        elif event.type == "input_json":
+                            chunk = event.partial_json
+                        else:
+                            continue
+                        if scanner is None:
+                            scanner = _PickStreamScanner()
+                        streamed_picks.extend(_filter_valid(scanner.feed(chunk)))
+                        if len(streamed_picks) >= _MAX_INITIAL_PICKS:
+                            # Leaving the context manager closes the stream
+                            return None, streamed_picks[:_MAX_INITIAL_PICKS]
+                    return await stream.get_final_message(), None
+            
+            response, streamed_picks = await self._retry_claude_request(
                 make_request, 
                 "Claude Initial Picks"
             )
             
-            content = self._extract_text_from_response(response)
-            logger.info(f"🤖 Claude provided autonomous trading picks with web search")
+            if streamed_picks:
+                logger.info("✅ Claude autonomously picked %s trading opportunities (stream stopped early)", len(streamed_picks))
+                for rec in streamed_picks:
+                    logger.info("   📊 %s %s (confidence: %.1f%%)", rec['symbol'], rec['strategy_type'], rec.get('initial_confidence', 0) * 100)
+                return streamed_picks
+            
+            logger.info("🤖 Claude provided autonomous trading picks with web search")
+            
+            # Prefer the structured submit_trading_plan call - the SDK has already parsed it
+            text, tool_blocks = self._split_response_blocks(response)
+            recommendations = None
+            for block in tool_blocks:
+                if block.name == "submit_trading_plan":
+                    recommendations = block.input.get('picks', [])
+                    break
             
             # Parse JSON response with better error handling
             try:
-                import json
-                
-                # Clean the response - remove any markdown formatting
-                content = content.replace('```json', '').replace('```', '').strip()
-                
-                # Find JSON array bounds
-                start_idx = content.find('[')
-                end_idx = content.rfind(']') + 1
-                
-                if start_idx >= 0 and end_idx > start_idx:
-                    json_str = content[start_idx:end_idx]
-                    recommendations = json.loads(json_str)
+                # Claude answered in text instead; if that text isn't valid JSON, ask
+                # once for a corrected array rather than discarding the whole call
+                for attempt in range(2):
+                    if recommendations is not None:
+                        break
+                    # Clean any markdown formatting
+                    content = text.replace('```json', '').replace('```', '').strip()
                     
-                    # Validate the structure
-                    valid_recommendations = []
-                    for rec in recommendations:
-                        if self._validate_recommendation_structure(rec):
-                            valid_recommendations.append(rec)
-                        else:
-                            logger.warning(f"⚠️ Invalid recommendation structure: {rec}")
+                    # Find JSON array bounds
+                    start_idx = content.find('[')
+                    end_idx = content.rfind(']') + 1
                     
-                    if valid_recommendations:
-                        logger.info(f"✅ Claude autonomously picked {len(valid_recommendations)} trading opportunities")
-                        for rec in valid_recommendations:
-                            logger.info(f"   📊 {rec['symbol']} {rec['strategy_type']} (confidence: {rec.get('initial_confidence', 0):.1%})")
-                        return valid_recommendations
-                    else:
-                        logger.warning("⚠️ No valid recommendations in Claude's response")
+                    if not (start_idx >= 0 and end_idx > start_idx):
+                        logger.warning("⚠️ No valid JSON array found in Claude's response")
                         return []
+                    
+                    json_str = content[start_idx:end_idx]
+                    try:
+                        recommendations = orjson.loads(json_str)
+                    except json.JSONDecodeError as e:
+                        if attempt:
+                            raise
+                        logger.warning("⚠️ Claude's picks weren't valid JSON (%s at pos %s) - asking for a correction", e.msg, e.pos)
+                        text = await self._repair_picks_json(prompt, json_str, e)
+                
+                # Validate the structure
+                valid_recommendations = _filter_valid(recommendations)
+                
+                if valid_recommendations:
+                    logger.info("✅ Claude autonomously picked %s trading opportunities", len(valid_recommendations))
+                    for rec in valid_recommendations:
+                        logger.info("   📊 %s %s (confidence: %.1f%%)", rec['symbol'], rec['strategy_type'], rec.get('initial_confidence', 0) * 100)
+                    return valid_recommendations
                 else:
-                    logger.warning("⚠️ No valid JSON array found in Claude's response")
+                    logger.warning("⚠️ No valid recommendations in Claude's response")
                     return []
                     
             except json.JSONDecodeError as e:
-                logger.error(f"❌ JSON parsing error in Claude's autonomous picks: {e}")
-                logger.error(f"Raw content: {content}")
+                logger.error("❌ JSON parsing error in Claude's autonomous picks: %s", e)
+                logger.error("Raw content: %s", content)
                 return []
                 
         except Exception as e:
-            logger.error(f"❌ Failed to get Claude's autonomous picks after retries: {e}")
+            logger.error("❌ Failed to get Claude's autonomous picks after retries: %s", e)
             # Add more specific error handling for common issues
             if "ServerToolUseBlock" in str(e):
                 logger.error("🔧 Claude used tools but response parsing failed - this is a known issue being fixed")
             elif any(code in str(e) for code in ["rate_limit_error", "429", "500", "529", "overloaded"]):
                 logger.error("⚠️ Claude API overloaded after retries - falling back to dynamic picks")
             else:
-                logger.error(f"⚠️ Unexpected Claude API error: {e}")
+                logger.error("⚠️ Unexpected Claude API error: %s", e)
             
             # Generate fallback picks on error
             logger.info("🤖 Generating fallback picks due to Claude API issues...")
             fallback_picks = self._generate_fallback_picks(portfolio)
             if fallback_picks:
-                logger.info(f"✅ Generated {len(fallback_picks)} fallback picks after API failure")
+                logger.info("✅ Generated %s fallback picks after API failure", len(fallback_picks))
                 return fallback_picks
             
             return []
     
-    def _validate_recommendation_structure(self, rec: Dict[str, Any]) -> bool:
-        """Validate that Claude's recommendation has the required structure for live data search"""
-        required_fields = ['symbol', 'strategy_type', 'initial_confidence']
-        
-        # Check required fields
-        for field in required_fields:
-            if field not in rec:
-                logger.warning(f"Missing required field: {field}")
-                return False
-        
-        # Validate symbol is string and not empty
-        if not isinstance(rec['symbol'], str) or not rec['symbol'].strip():
-            logger.warning(f"Invalid symbol: {rec.get('symbol')}")
-            return False
-        
-        # Validate strategy type
-        valid_strategies = ['long_call', 'long_put', 'call_spread', 'put_spread', 'iron_condor', 'straddle', 'strangle', 'covered_call', 'protective_put']
-        if rec['strategy_type'] not in valid_strategies:
-            logger.warning(f"Invalid strategy type: {rec.get('strategy_type')}")
-            return False
-        
-        # Validate confidence is numeric
-        confidence = rec.get('initial_confidence')
-        if not isinstance(confidence, (int, float)) or confidence < 0 or confidence > 1:
-            logger.warning(f"Invalid confidence: {confidence}")
-            return False
+    async def _repair_picks_json(self, prompt: str, bad_text: str, error: json.JSONDecodeError) -> str:
+        """Re-ask Claude for the picks array, quoting the parse error from its last reply"""
+        async def make_request():
+            return await self.client.messages.create(
+                model=self.model,
+                max_tokens=600,
+                temperature=self.temperature,
+                system=_INITIAL_PICKS_SYSTEM,
+                messages=[
+                    {"role": "user", "content": prompt},
+                    {"role": "assistant", "content": bad_text},
+                    {"role": "user", "content": f"That wasn't valid JSON: {error.msg} at pos {error.pos}. Return only the JSON array."}
+                ]
+            )
         
-        return True
+        response = await self._retry_claude_request(make_request, "Claude Initial Picks JSON Repair")
+        return self._extract_text_fast(response)
     
     async def _search_live_data_for_symbols(self, symbols: List[str]) -> Dict[str, Any]:
         """Step 2: Get comprehensive live market data for Claude's recommended symbols"""
         try:
-            live_data = {}
+            semaphore = asyncio.Semaphore(settings.LIVE_DATA_MAX_CONCURRENCY)
             
             async with WebSearchService() as search_service:
-                for symbol in symbols:
-                    logger.info(f"🔍 Comprehensive web research for {symbol}...")
-                    
-                    # Get comprehensive research data
-                    research_results = await search_service.comprehensive_stock_research(symbol)
+                async def research_symbol(symbol: str) -> Dict[str, Any]:
+                    async with semaphore:
+                        logger.info("🔍 Comprehensive web research for %s...", symbol)
+                        
+                        # Get comprehensive research data
+                        research_results = await self._cached_research(search_service, symbol)
                     
                     if research_results and 'error' not in research_results:
-                        live_data[symbol] = {
-                            'price_data': research_results.get('price_data', {}),
+                        price_data = research_results.get('price_data', {})
+                        if price_data:
+                            logger.info("✅ Comprehensive data for %s: $%s (%+.2f%%)", symbol, price_data.get('current_price', 'N/A'), price_data.get('change_pct', 0))
+                            logger.info("   Sources: %s", ', '.join(research_results.get('sources', [])))
+                            logger.info("   News: %s articles", len(research_results.get('news', [])))
+                            logger.info("   Technical: %s", research_results.get('technical_analysis', {}).get('trend', 'N/A'))
+                        
+                        return {
+                            'price_data': price_data,
                             'news': research_results.get('news', []),
                             'earnings': research_results.get('earnings', {}),
                             'technical_analysis': research_results.get('technical_analysis', {}),
@@ -549,39 +1332,62 @@ Return JSON only:""" + """
                             'sources': research_results.get('sources', []),
                             'timestamp': research_results.get('timestamp', '')
                         }
-                        
-                        price_data = research_results.get('price_data', {})
-                        if price_data:
-                            logger.info(f"✅ Comprehensive data for {symbol}: ${price_data.get('current_price', 'N/A')} ({price_data.get('change_pct', 0):+.2f}%)")
-                            logger.info(f"   Sources: {', '.join(research_results.get('sources', []))}")
-                            logger.info(f"   News: {len(research_results.get('news', []))} articles")
-                            logger.info(f"   Technical: {research_results.get('technical_analysis', {}).get('trend', 'N/A')}")
-                    else:
-                        logger.warning(f"⚠️ No comprehensive data found for {symbol}")
-                        live_data[symbol] = {"error": "No comprehensive data available"}
+                    
+                    logger.warning("⚠️ No comprehensive data found for %s", symbol)
+                    return {"error": "No comprehensive data available"}
+                
+                results = await asyncio.gather(
+                    *(research_symbol(symbol) for symbol in symbols),
+                    return_exceptions=True
+                )
+            
+            live_data = {}
+            for symbol, result in zip(symbols, results):
+                if isinstance(result, Exception):
+                    logger.warning("⚠️ Comprehensive research failed for %s: %s", symbol, result)
+                    result = {"error": str(result)}
+                live_data[symbol] = result
             
             return live_data
             
         except Exception as e:
-            logger.error(f"❌ Failed to search comprehensive live data: {e}")
+            logger.error("❌ Failed to search comprehensive live data: %s", e)
             # Fallback to basic search
             return await self._get_market_data_fallback(symbols)
     
+    async def _cached_research(self, search_service: WebSearchService, symbol: str) -> Dict[str, Any]:
+        """comprehensive_stock_research with a short TTL cache; concurrent lookups of one symbol share a fetch"""
+        cached = self._research_cache.get(symbol)
+        if cached and time.monotonic() - cached[0] < _RESEARCH_TTL_SECONDS:
+            return cached[1]
+        
+        lock = self._research_locks.setdefault(symbol, asyncio.Lock())
+        async with lock:
+            # Another task may have filled the cache while we waited
+            cached = self._research_cache.get(symbol)
+            if cached and time.monotonic() - cached[0] < _RESEARCH_TTL_SECONDS:
+                logger.info("♻️ Reusing recent research for %s", symbol)
+                return cached[1]
+            
+            results = await search_service.comprehensive_stock_research(symbol)
+            if results and 'error' not in results:
+                self._research_cache[symbol] = (time.monotonic(), results)
+            return results
+    
     async def _get_market_data_fallback(self, symbols: List[str]) -> Dict[str, Any]:
         """Fallback: Use our market data service for live data"""
         try:
-            from src.services.market_data_service import MarketDataService
+            market_service = await self._ensure_market_data()
             
-            market_service = MarketDataService()
-            await market_service.initialize()
+            semaphore = asyncio.Semaphore(settings.LIVE_DATA_MAX_CONCURRENCY)
             
-            live_data = {}
-            
-            for symbol in symbols:
+            async def fetch_symbol(symbol: str) -> Dict[str, Any]:
                 try:
-                    data = await market_service.get_market_data(symbol)
+                    async with semaphore:
+                        data = await market_service.get_market_data(symbol)
                     if data:
-                        live_data[symbol] = {
+                        logger.info("✅ Market data for %s: $%.2f (%+.2f%%)", symbol, data.price, data.change_pct)
+                        return {
                             "price": data.price,
                             "change_pct": data.change_pct,
                             "volume": data.volume,
@@ -589,52 +1395,138 @@ Return JSON only:""" + """
                             "ask": data.ask,
                             "timestamp": data.timestamp.isoformat()
                         }
-                        logger.info(f"✅ Market data for {symbol}: ${data.price:.2f} ({data.change_pct:+.2f}%)")
-                    else:
-                        live_data[symbol] = {"error": "No data available"}
+                    return {"error": "No data available"}
                         
                 except Exception as e:
-                    logger.warning(f"⚠️ Failed to get data for {symbol}: {e}")
-                    live_data[symbol] = {"error": str(e)}
+                    logger.warning("⚠️ Failed to get data for %s: %s", symbol, e)
+                    return {"error": str(e)}
             
-            await market_service.close()
-            return live_data
+            results = await asyncio.gather(*(fetch_symbol(symbol) for symbol in symbols))
+            
+            return dict(zip(symbols, results))
             
         except Exception as e:
-            logger.error(f"❌ Market data fallback failed: {e}")
+            logger.error("❌ Market data fallback failed: %s", e)
             return {}
     
+    async def _submit_batch_analysis(self, picks: List[Dict[str, Any]], live_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Review each pick against its live data in one Message Batches submission
+        
+        Returns reviews keyed by symbol; symbols whose review failed are left out.
+        """
+        try:
+            # Batch custom ids only allow [a-zA-Z0-9_-], so index the picks instead
+            # of using symbols like BRK.B directly
+            requests = []
+            symbols_by_id = {}
+            system = _BATCH_REVIEW_SYSTEM  # Identical for every request
+            for i, pick in enumerate(picks):
+                symbol = pick.get('symbol', '')
+                custom_id = f"pick-{i}"
+                symbols_by_id[custom_id] = symbol
+                # Static prefix plus one serialization of the per-pick data
+                prompt = _BATCH_REVIEW_PROMPT_PREFIX + orjson.dumps(
+                    {"pick": pick, "live_data": live_data.get(symbol, {})}, default=_orjson_default
+                ).decode()
+                requests.append({
+                    "custom_id": custom_id,
+                    "params": {
+                        "model": self.model,
+                        "max_tokens": 400,
+                        "system": system,
+                        "messages": [{"role": "user", "content": prompt}]
+                    }
+                })
+            
+            batch = await self.client.messages.batches.create(requests=requests)
+            logger.info("📦 Submitted review batch %s for %s picks", batch.id, len(requests))
+            
+            # Poll until the batch ends. Past the (capped) wait it is cancelled and
+            # the picks go ahead unreviewed, as they do with batch review disabled
+            max_wait = min(settings.CLAUDE_BATCH_MAX_WAIT_SECONDS, _BATCH_REVIEW_WAIT_CAP_SECONDS)
+            deadline = time.monotonic() + max_wait
+            while batch.processing_status != "ended":
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning("⚠️ Review batch %s still %s after %ss - cancelling and using the initial picks", batch.id, batch.processing_status, max_wait)
+                    await self.client.messages.batches.cancel(batch.id)
+                    return {}
+                await asyncio.sleep(min(settings.CLAUDE_BATCH_POLL_SECONDS, remaining))
+                batch = await self.client.messages.batches.retrieve(batch.id)
+            
+            reviews = {}
+            async for entry in await self.client.messages.batches.results(batch.id):
+                symbol = symbols_by_id.get(entry.custom_id)
+                if entry.result.type != "succeeded":
+                    logger.warning("⚠️ Batch review for %s %s", symbol, entry.result.type)
+                    continue
+                
+                content = self._extract_text_fast(entry.result.message)
+                match = _JSON_RE.search(content)
+                if match:
+                    try:
+                        reviews[symbol] = orjson.loads(match.group(0))
+                    except orjson.JSONDecodeError as e:
+                        logger.warning("⚠️ Could not parse batch review for %s: %s", symbol, e)
+            
+            logger.info("✅ Claude reviewed %s/%s picks in batch %s", len(reviews), len(requests), batch.id)
+            return reviews
+            
+        except Exception as e:
+            logger.error("❌ Batch review of Claude's picks failed: %s", e)
+            return {}
+    
+    def _apply_batch_reviews(self, picks: List[Dict[str, Any]], reviews: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop rejected picks and fold review prices/confidence into the rest"""
+        reviewed_picks = []
+        for pick in picks:
+            review = reviews.get(pick.get('symbol', ''))
+            if review is None:
+                # No review came back - keep the initial pick as-is
+                reviewed_picks.append(pick)
+                continue
+            
+            if review.get('approve') is False:
+                logger.info("🚫 Claude dropped %s after reviewing live data: %s", pick['symbol'], review.get('rationale', ''))
+                continue
+            
+            reviewed_picks.append({
+                **pick,
+                'initial_confidence': review.get('confidence', pick.get('initial_confidence')),
+                'rationale': review.get('rationale', pick.get('rationale')),
+                'buy_under_price': review.get('buy_under_price'),
+                'sell_over_price': review.get('sell_over_price'),
+                'exit_date': review.get('exit_date')
+            })
+        
+        return reviewed_picks
+    
     async def _get_claude_final_decision(self, portfolio: PortfolioSummary, initial_recommendations: List[Dict], live_data: Dict[str, Any], current_positions: List) -> Optional[MorningStrategyResponse]:
         """Step 3: Claude reviews current prices and gives final trades (MINIMAL TOKENS)"""
         try:
-            # Extract current prices from live data
-            price_summary = []
-            for symbol, data in live_data.items():
-                price_data = data.get('price_data', {})
-                current_price = price_data.get('current_price', 'N/A')
-                change_pct = price_data.get('change_pct', 0)
-                price_summary.append(f"{symbol}: ${current_price} ({change_pct:+.1f}%)")
-            
-            prompt = f"""Your picks: {json.dumps(initial_recommendations, indent=1)}
-
-Current prices: {'; '.join(price_summary)}
+            # One entry per symbol carrying Claude's pick and its live prices, so
+            # every symbol is reviewed in this single request
+            symbols_payload = [{
+                "symbol": pick.get('symbol', ''),
+                "pick": pick,
+                "live": live_data.get(pick.get('symbol', ''), {}).get('price_data', {})
+            } for pick in initial_recommendations]
+            
+            # Fill fields Claude's review doesn't repeat from the matching pick
+            defaults_by_symbol = _pick_defaults(initial_recommendations)
+            
+            # Compact JSON - indentation only costs prompt tokens
+            prompt = f"""Your picks with current prices: {orjson.dumps({"symbols": symbols_payload}, default=_orjson_default).decode()}
 
-Portfolio: ${(portfolio.cash_balance if portfolio else 100000):,.0f} cash
-
-Review current prices. For each pick, provide:
-1. Buy under price (specific)
-2. Sell over price (specific) 
-3. Exit date if neither hit
-
-JSON only:
-{{"market_assessment":{{"overall_sentiment":"bullish","recommended_exposure":"normal"}},"cash_strategy":{{"action":"DEPLOY","percentage":80,"reasoning":"Good setups"}},"opportunities":[{{"symbol":"NVDA","strategy_type":"long_call","confidence":0.75,"strike_price":145,"buy_under_price":148.50,"sell_over_price":165,"exit_date":"2025-08-20","rationale":"Current price good for entry","entry_criteria":"Buy if under $148.50","exit_criteria":"Sell at $165 or exit 2025-08-20"}}]}}"""
+Portfolio: ${(portfolio.cash_balance if portfolio else 100000):,.0f} cash"""
             
             # Use retry mechanism for Claude API call (MINIMAL TOKENS)
             async def make_request():
                 return await self.client.messages.create(
                 model=self.model,
                     max_tokens=1000,  # Drastically reduced from 4000
-                temperature=0.3,
+                temperature=self.temperature,
+                    system=_FINAL_DECISION_SYSTEM,  # Static rubric and example
                     messages=[{"role": "user", "content": prompt}]  # No more tools needed
                 )
             
@@ -643,28 +1535,15 @@ JSON only:
                 "Claude Final Decision"
             )
             
-            content = self._extract_text_from_response(response)
-            logger.info(f"🤖 Claude reviewed live data for its autonomous picks")
+            content = self._extract_text_fast(response)
+            logger.info("🤖 Claude reviewed live data for its autonomous picks")
             
             # Handle case where Claude provided no text response
             if not content or content.strip() == "":
                 logger.warning("⚠️ Claude provided no text response for final decision")
                 logger.info("🔄 Converting initial picks to opportunities format")
                 # Convert initial picks to proper format instead of returning None
-                opportunities = []
-                for pick in initial_recommendations:
-                                    opportunities.append(OptionsOpportunity(
-                    symbol=pick.get('symbol', ''),
-                    strategy_type=pick.get('strategy_type', 'long_call'),
-                    confidence=pick.get('initial_confidence', 0.7),
-                    rationale=pick.get('rationale', 'Claude initial pick'),
-                    risk_assessment='Moderate risk',
-                    time_horizon=21,  # 3 weeks in days
-                    target_return=1500.0,
-                    max_risk=1000.0,
-                    contracts=[],
-                    priority='Normal'
-                ))
+                opportunities = [_pick_to_opportunity(pick) for pick in initial_recommendations]
                 
                 return MorningStrategyResponse(
                     market_assessment=MarketAssessment(
@@ -681,17 +1560,17 @@ JSON only:
                 )
             
             # Parse the final response
-            parsed_response = self._parse_live_morning_response(content)
+            parsed_response = self._parse_live_morning_response(content, defaults_by_symbol)
             
             if parsed_response:
-                logger.info(f"✅ Claude confirmed {len(parsed_response.opportunities)} autonomous opportunities after live data review")
+                logger.info("✅ Claude confirmed %s autonomous opportunities after live data review", len(parsed_response.opportunities))
                 return parsed_response
             else:
                 logger.warning("⚠️ Failed to parse Claude's final autonomous decision")
                 return None
                 
         except Exception as e:
-            logger.error(f"❌ Failed to get Claude's final autonomous decision after retries: {e}")
+            logger.error("❌ Failed to get Claude's final autonomous decision after retries: %s", e)
             # Add more specific error handling for common issues
             if "ServerToolUseBlock" in str(e):
                 logger.error("🔧 Claude used tools but response parsing failed - this is a known issue being fixed")
@@ -705,153 +1584,50 @@ JSON only:
     
     def _format_live_data_for_claude(self, live_data: Dict[str, Any]) -> str:
         """Format comprehensive live market data in a readable way for Claude"""
-        formatted = "COMPREHENSIVE WEB RESEARCH DATA:\n\n"
+        parts = ["COMPREHENSIVE WEB RESEARCH DATA:\n\n"]
+        append = parts.append
         
         for symbol, data in live_data.items():
             if "error" in data:
-                formatted += f"• {symbol}: ❌ {data['error']}\n\n"
-            else:
-                # Price data
-                price_data = data.get('price_data', {})
-                if price_data:
-                    price = price_data.get('current_price', 'N/A')
-                    change = price_data.get('change_pct', 0)
-                    volume = price_data.get('volume', 0)
-                    market_cap = price_data.get('market_cap', 'N/A')
-                    pe_ratio = price_data.get('pe_ratio', 'N/A')
-                    
-                    formatted += f"📊 {symbol} PRICE DATA:\n"
-                    formatted += f"   Current Price: ${price} ({change:+.2f}%)\n"
-                    formatted += f"   Volume: {volume:,}\n"
-                    formatted += f"   Market Cap: ${market_cap:,}\n" if market_cap != 'N/A' else f"   Market Cap: {market_cap}\n"
-                    formatted += f"   P/E Ratio: {pe_ratio}\n"
-                
-                # News data
-                news = data.get('news', [])
-                if news:
-                    formatted += f"📰 {symbol} RECENT NEWS ({len(news)} articles):\n"
-                    for i, article in enumerate(news[:3], 1):  # Show top 3 news
-                        title = article.get('title', 'No title')
-                        formatted += f"   {i}. {title[:80]}{'...' if len(title) > 80 else ''}\n"
-                
-                # Earnings data
-                earnings = data.get('earnings', {})
-                if earnings:
-                    next_earnings = earnings.get('next_earnings_date', 'N/A')
-                    earnings_est = earnings.get('earnings_estimate', 'N/A')
-                    revenue_est = earnings.get('revenue_estimate', 'N/A')
-                    
-                    formatted += f"📅 {symbol} EARNINGS:\n"
-                    formatted += f"   Next Earnings: {next_earnings}\n"
-                    formatted += f"   EPS Estimate: {earnings_est}\n"
-                    formatted += f"   Revenue Estimate: {revenue_est}\n"
-                
-                # Technical analysis
-                technical = data.get('technical_analysis', {})
-                if technical:
-                    trend = technical.get('trend', 'N/A')
-                    rsi = technical.get('rsi', 'N/A')
-                    sma_20 = technical.get('sma_20', 'N/A')
-                    sma_10 = technical.get('sma_10', 'N/A')
-                    
-                    formatted += f"📈 {symbol} TECHNICAL ANALYSIS:\n"
-                    formatted += f"   Trend: {trend}\n"
-                    formatted += f"   RSI: {rsi:.1f}\n" if rsi != 'N/A' else f"   RSI: {rsi}\n"
-                    formatted += f"   SMA 20: ${sma_20:.2f}\n" if sma_20 != 'N/A' else f"   SMA 20: {sma_20}\n"
-                    formatted += f"   SMA 10: ${sma_10:.2f}\n" if sma_10 != 'N/A' else f"   SMA 10: {sma_10}\n"
-                
-                # Market sentiment
-                sentiment = data.get('market_sentiment', {})
-                if sentiment:
-                    sentiment_level = sentiment.get('sentiment', 'N/A')
-                    confidence = sentiment.get('confidence', 'N/A')
-                    
-                    formatted += f"🎯 {symbol} MARKET SENTIMENT:\n"
-                    formatted += f"   Sentiment: {sentiment_level}\n"
-                    formatted += f"   Confidence: {confidence:.1%}\n" if confidence != 'N/A' else f"   Confidence: {confidence}\n"
-                
-                # Sources
-                sources = data.get('sources', [])
-                if sources:
-                    formatted += f"🔍 Data Sources: {', '.join(sources)}\n"
-                
-                formatted += "\n" + "="*50 + "\n\n"
+                append(f"• {symbol}: ❌ {data['error']}\n\n")
+                continue
+            
+            # Empty sections are skipped with a single truthiness test
+            for key, format_section in _SECTIONS:
+                section = data.get(key)
+                if section:
+                    format_section(parts, symbol, section)
+            
+            # Sources
+            sources = data.get('sources')
+            if sources:
+                append(f"🔍 Data Sources: {', '.join(sources)}\n")
+            
+            append(_SYMBOL_SEPARATOR)
         
-        return formatted
+        return "".join(parts)
     
     def _generate_fallback_picks(self, portfolio: PortfolioSummary) -> List[Dict[str, Any]]:
         """Generate dynamic fallback picks when Claude API fails"""
         try:
-            from datetime import datetime
-            import random
-            
             # Get risk level safely
             risk_level = portfolio.get_adaptive_risk_level() if portfolio else 'normal'
             current_streak = getattr(portfolio.performance_history, 'current_streak', 0) if portfolio and portfolio.performance_history else 0
             cash_balance = portfolio.cash_balance if portfolio else 100000
             
-            fallback_picks = []
-            
-            # Dynamic symbol rotation based on market conditions and time
-            liquid_symbols = ["SPY", "QQQ", "IWM", "AAPL", "MSFT", "NVDA", "GOOGL", "TSLA"]
-            conservative_symbols = ["SPY", "QQQ", "IWM"]  # ETFs for conservative approach
-            aggressive_symbols = ["AAPL", "MSFT", "NVDA", "GOOGL", "TSLA"]  # Individual stocks
-            
-            # Time-based rotation to vary picks
-            day_of_year = datetime.now().timetuple().tm_yday
-            rotation_index = day_of_year % len(liquid_symbols)
-            
-            if risk_level == "conservative":
-                symbol_pool = conservative_symbols
-                strategies = ["iron_condor", "cash_secure_put", "covered_call"]
-            elif risk_level == "aggressive":
-                symbol_pool = aggressive_symbols
-                strategies = ["long_call", "long_put", "straddle", "call_spread"]
-            else:  # normal
-                symbol_pool = liquid_symbols
-                strategies = ["iron_condor", "call_spread", "put_spread", "long_call"]
-            
-            # Pick 1-2 symbols based on performance
-            num_picks = 2 if current_streak > 2 else 1
-            selected_symbols = []
-            
-            for i in range(min(num_picks, len(symbol_pool))):
-                idx = (rotation_index + i) % len(symbol_pool)
-                selected_symbols.append(symbol_pool[idx])
-            
-            for symbol in selected_symbols:
-                # Strategy selection based on streak and symbol type
-                if current_streak >= 3:
-                    strategy = "long_call" if symbol in aggressive_symbols else "call_spread"
-                elif current_streak <= -2:
-                    strategy = "cash_secure_put" if symbol in conservative_symbols else "put_spread"
-                else:
-                    strategy = strategies[rotation_index % len(strategies)]
-                
-                confidence = 0.75 if current_streak > 0 else 0.72
-                
-                fallback_picks.append({
-                    "symbol": symbol,
-                    "strategy_type": strategy,
-                    "initial_confidence": confidence,
-                    "rationale": f"Dynamic fallback for {symbol} - {strategy} strategy based on {risk_level} risk profile and {current_streak} streak",
-                    "reasoning": f"Systematic rotation pick: Day {day_of_year} rotation, {risk_level} risk, suitable for current portfolio state",
-                    "time_horizon": "2-3 weeks",
-                    "expected_move": "based on technical analysis and market sentiment",
-                    "web_research_summary": f"Dynamic fallback rotation - {symbol} selected for {strategy} based on risk profile"
-                })
-                
-                logger.info(f"🎲 Dynamic fallback generated: {symbol} {strategy} (confidence: {confidence:.0%})")
-            
             # Only return picks if we have sufficient cash
-            if cash_balance > 5000:
-                return fallback_picks
-            else:
+            if cash_balance <= 5000:
                 logger.info("💰 Insufficient cash for fallback picks")
                 return []
+            
+            # Copies, so callers can still mutate the picks
+            fallback_picks = [dict(pick) for pick in _compute_fallback_picks(date.today().toordinal(), risk_level, current_streak)]
+            for pick in fallback_picks:
+                logger.info("🎲 Dynamic fallback generated: %s %s (confidence: %.0f%%)", pick['symbol'], pick['strategy_type'], pick['initial_confidence'] * 100)
+            return fallback_picks
                 
         except Exception as e:
-            logger.error(f"❌ Failed to generate dynamic fallback picks: {e}")
+            logger.error("❌ Failed to generate dynamic fallback picks: %s", e)
             # Ultra-safe fallback to SPY
             return [{
                 "symbol": "SPY",
@@ -872,125 +1648,81 @@ JSON only:
         Individual position analysis with Claude
         Maintains conversation thread for each position
         """
-        logger.info(f"🔍 Analyzing position {position.id} ({position.symbol})")
-        
-        if self.daily_query_count >= settings.CLAUDE_MAX_DAILY_QUERIES:
-            logger.warning("Daily Claude query limit reached")
-            return None
+        logger.info("🔍 Analyzing position %s (%s)", position.id, position.symbol)
+        now = datetime.utcnow()  # One clock read for the whole request
         
         # Get or create conversation thread
         conversation_id = position.claude_conversation_id
-        if conversation_id not in self.conversation_threads:
-            self.conversation_threads[conversation_id] = []
+        thread = self._get_thread(conversation_id)
         
         # Prepare position context
         context = self._prepare_position_context(position, market_data, portfolio_context)
         
         # Check if this is first analysis or follow-up
-        is_followup = len(self.conversation_threads[conversation_id]) > 0
+        is_followup = len(thread) > 0
         
         if is_followup:
-            prompt = f"""
-            Following up on our previous analysis of {position.symbol} position.
-            
-            Position Update:
-            {context['position_update']}
-            
-            Current Market Data:
-            {context['market_update']}
-            
-            Time Since Last Check: {self._time_since_last_check(position)}
-            
-            Key Changes Since Last Analysis:
-            {context['changes']}
-            
-            RESPONSE FORMAT: Return ONLY valid JSON object. No additional text or markdown.
-            
-            Schema:
-            {{
-              "action": "HOLD",
-              "confidence": 0.85,
-              "reasoning": "Detailed explanation for the decision...",
-              "market_outlook": "Bullish/Bearish/Neutral with reasoning",
-              "volatility_assessment": "Current IV analysis and expectations",
-              "risk_assessment": "Risk level and management considerations",
-              "target_price": 155.0,
-              "stop_loss": 145.0,
-              "time_horizon": 14
-            }}
-            
-            Action options: HOLD, CLOSE, ADJUST_STOP, ADJUST_TARGET, ROLL_OPTION, ADD_POSITION
-            
-            Analysis Requirements:
-            - Current P&L: {position.pnl_percentage:.1f}%
-            - Days to expiration: {min(c.days_to_expiration for c in position.contracts)}
-            - Time decay impact (theta)
-            - Volatility changes
-            - Portfolio risk impact
-            """
+            # _prepare_position_context has no separate update fields; follow-ups
+            # resend the current snapshot and let Claude diff it against the thread
+            prompt = _FOLLOWUP_POS_PROMPT.format_map({
+                "position_update": context['position_details'],
+                "market_update": context['market_analysis'],
+                "changes": "Compare the position update above with your previous analysis",
+                "symbol": position.symbol,
+                "time_since_last_check": self._time_since_last_check(position, now),
+                "pnl": position.pnl_percentage,
+                "dte": position.min_dte,
+            })
         else:
-            prompt = f"""
-            Initial analysis for new {position.symbol} options position.
-            
-            Position Details:
-            {context['position_details']}
-            
-            Market Analysis:
-            {context['market_analysis']}
-            
-            Portfolio Context:
-            {context['portfolio_context']}
-            
-            RESPONSE FORMAT: Return ONLY valid JSON object. No additional text or markdown.
-            
-            Schema:
-            {{
-              "action": "HOLD",
-              "confidence": 0.85,
-              "reasoning": "Initial assessment of the position setup and market conditions...",
-              "market_outlook": "Bullish/Bearish/Neutral with reasoning",
-              "volatility_assessment": "Current IV analysis and expectations",
-              "risk_assessment": "Risk level and management plan",
-              "target_price": 155.0,
-              "stop_loss": 145.0,
-              "time_horizon": 14
-            }}
-            
-            Action options: HOLD, CLOSE, ADJUST_STOP, ADJUST_TARGET, ROLL_OPTION
-            
-            Analysis Requirements:
-            - Initial risk assessment and Greeks impact
-            - Target exit strategy and key levels
-            - Timeline for next check-in
-            - How position fits within portfolio limits
-            """
+            prompt = _INITIAL_POS_PROMPT.format_map({**context, "symbol": position.symbol})
+        
+        # The reply is one small JSON object after any searches; follow-ups explain
+        # more against the history. A reply cut off at the limit is retried once with
+        # twice the room. The retry is a fresh request that searches again, so it
+        # reserves its own daily query
+        max_tokens = _FOLLOWUP_ANALYSIS_MAX_TOKENS if is_followup else _INITIAL_ANALYSIS_MAX_TOKENS
+        
+        if not await self._reserve_query():
+            logger.warning("Daily Claude query limit reached")
+            return None
         
         try:
-            response = await self.client.messages.create(
-                model=self.model,
-                max_tokens=2000,
-                temperature=0.3,
-                tools=[{"type": "web_search_20250305", "name": "web_search", "max_uses": 2}],
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            content = self._extract_text_from_response(response)
-            decision = self._parse_position_response(content, position.id, conversation_id)
-            self.daily_query_count += 1
+            for attempt in range(2):
+                try:
+                    response = await self.client.messages.create(
+                        model=self.model,
+                        max_tokens=max_tokens,
+                        temperature=self.temperature,
+                        tools=[{"type": "web_search_20250305", "name": "web_search", "max_uses": 2}],
+                        messages=[{"role": "user", "content": prompt}]
+                    )
+                except Exception:
+                    await self._refund_query()
+                    raise
+                
+                content = self._extract_text_from_response(response)
+                decision = self._parse_position_response(content, position.id, conversation_id)
+                if decision or response.stop_reason != "max_tokens" or attempt:
+                    break
+                
+                if not await self._reserve_query():
+                    logger.warning("⚠️ Position analysis for %s hit the token limit and no daily queries are left to retry", position.symbol)
+                    break
+                max_tokens *= 2
+                logger.warning("⚠️ Position analysis for %s hit the token limit - retrying with %s tokens", position.symbol, max_tokens)
             
             # Update conversation thread
-            self.conversation_threads[conversation_id].append({
-                "timestamp": datetime.utcnow().isoformat(),
-                "prompt": prompt,
+            await self._append_to_thread(conversation_id, {
+                "timestamp": now,
                 "response": content,
-                "decision": decision.dict() if decision else None
+                "decision": decision
             })
             
-            logger.info(f"✅ Position analysis complete with web search. Action: {decision.action if decision else 'None'}")
+            logger.info("✅ Position analysis complete with web search. Action: %s", decision.action if decision else 'None')
             return decision
             
         except Exception as e:
-            logger.error(f"❌ Position analysis failed: {e}")
+            logger.error("❌ Position analysis failed: %s", e)
             return None
     
     async def evening_review_session(self,
@@ -1003,80 +1735,36 @@ JSON only:
         """
         logger.info("🌆 Starting evening Claude review session")
         
-        if self.daily_query_count >= settings.CLAUDE_MAX_DAILY_QUERIES:
-            logger.warning("Daily Claude query limit reached")
-            return {}
-        
         context = self._prepare_evening_context(portfolio, positions, daily_trades, market_summary)
         
-        prompt = f"""
-        🌆 END-OF-DAY PORTFOLIO REVIEW WITH WEB SEARCH ANALYSIS
-        
-        You are an expert options trader with access to comprehensive web search capabilities.
-        You MUST search multiple websites and sources to provide thorough end-of-day analysis.
-        
-        WEB SEARCH REQUIREMENTS FOR EVENING REVIEW:
-        - Search for after-hours market news and earnings announcements
-        - Research tomorrow's market catalysts and economic events
-        - Check for any breaking news affecting your positions
-        - Research sector performance and rotation trends
-        - Look for options flow data and unusual activity
-        - Search for analyst ratings changes and price target updates
-        - Research market sentiment and volatility expectations
-        
-        Today's Performance:
-        {context['performance']}
-        
-        Position Analysis:
-        {context['positions']}
-        
-        Trades Executed Today:
-        {context['trades']}
-        
-        Market Summary:
-        {context['market']}
+        prompt = _EVENING_PROMPT.format_map({
+            **context,
+            "total_delta": portfolio.total_delta,
+            "total_gamma": portfolio.total_gamma,
+            "total_theta": portfolio.total_theta,
+            "total_vega": portfolio.total_vega,
+        })
         
-        Portfolio Greeks Summary:
-        - Delta: {portfolio.total_delta}
-        - Gamma: {portfolio.total_gamma}
-        - Theta: {portfolio.total_theta} (daily decay)
-        - Vega: {portfolio.total_vega}
-        
-        WEB SEARCH ANALYSIS PROCESS:
-        1. Search for "after hours market news today"
-        2. Research each position: "[SYMBOL] after hours news earnings"
-        3. Check tomorrow's calendar: "market events tomorrow earnings"
-        4. Research sector trends: "sector rotation today market"
-        5. Look for options flow: "unusual options activity today"
-        6. Check analyst updates: "analyst ratings changes today"
-        
-        Please provide comprehensive analysis including:
-        1. Performance attribution analysis (what drove P&L) with web research context
-        2. Risk assessment of current portfolio based on market conditions
-        3. Positions requiring attention tomorrow
-        4. Strategy adjustments for tomorrow
-        5. Market outlook for next trading session
-        6. Lessons learned from today's trading
-        
-        Focus on:
-        - Greeks management and risk exposure
-        - Upcoming expirations and time decay
-        - Volatility changes and their impact
-        - Position adjustments needed
-        """
+        if not await self._reserve_query():
+            logger.warning("Daily Claude query limit reached")
+            return {}
         
         try:
-            response = await self.client.messages.create(
-                model=self.model,
-                max_tokens=3000,
-                temperature=0.3,
-                tools=[{"type": "web_search_20250305", "name": "web_search", "max_uses": 4}],
-                messages=[{"role": "user", "content": prompt}]
-            )
+            try:
+                response = await self.client.messages.create(
+                    model=self.model,
+                    # A short book doesn't need the full review length
+                    max_tokens=3000 if len(positions) > _EVENING_FULL_REVIEW_POSITIONS else 1500,
+                    temperature=self.temperature,
+                    tools=[{"type": "web_search_20250305", "name": "web_search", "max_uses": 4}],
+                    messages=[{"role": "user", "content": prompt}]
+                )
+            except Exception:
+                await self._refund_query()
+                raise
             
             content = self._extract_text_from_response(response)
             review = self._parse_evening_response(content)
-            self.daily_query_count += 1
             
             # Generate and save evening summary for dashboard
             await self._generate_and_save_evening_summary(portfolio, positions, review, market_summary)
@@ -1085,14 +1773,14 @@ JSON only:
             return review
             
         except Exception as e:
-            logger.error(f"❌ Evening review session failed: {e}")
+            logger.error("❌ Evening review session failed: %s", e)
             # Save fallback summary for error case
             try:
-                claude_summary_manager.save_evening_summary(
-                    summary="Evening session error - performance data may be incomplete",
-                    portfolio_performance="Unable to analyze due to error",
-                    next_day_outlook="Will retry analysis tomorrow morning"
-                )
+                _queue_summary("evening", {
+                    "summary": "Evening session error - performance data may be incomplete",
+                    "portfolio_performance": "Unable to analyze due to error",
+                    "next_day_outlook": "Will retry analysis tomorrow morning"
+                })
             except:
                 pass
             return {}
@@ -1104,76 +1792,71 @@ JSON only:
         """
         Emergency Claude analysis for significant position moves
         """
-        logger.warning(f"🚨 Emergency analysis triggered: {trigger}")
+        logger.warning("🚨 Emergency analysis triggered: %s", trigger)
         
-        # Reserve queries for emergencies
-        if self.daily_query_count >= settings.CLAUDE_MAX_DAILY_QUERIES - 2:
-            logger.error("Cannot perform emergency analysis - query limit reached")
-            return None
+        cache_key = ("emergency", trigger, position.id, round(position.pnl_percentage))
+        cached = self._get_cached_decision(cache_key, _EMERGENCY_CACHE_TTL_SECONDS)
+        if cached is not None:
+            logger.warning("🚨 Reusing emergency analysis from the last %ss. Action: %s", _EMERGENCY_CACHE_TTL_SECONDS, cached.action)
+            # A new decision record with the cached content - handing back the same
+            # instance would make two emergencies share one id when persisted
+            return cached.model_copy(update={"id": uuid4(), "created_at": datetime.utcnow()})
         
         context = self._prepare_emergency_context(trigger, position, market_data)
         
-        prompt = f"""
-        EMERGENCY POSITION ANALYSIS
-        
-        Trigger: {trigger}
-        
-        Position Status:
-        {context['position']}
-        
-        Market Conditions:
-        {context['market']}
+        prompt = _EMERGENCY_PROMPT.format_map({
+            **context,
+            "trigger": trigger,
+            "pnl": position.pnl_percentage,
+            "dte": position.min_dte,
+        })
         
-        URGENT: This position requires immediate attention.
-        
-        Current P&L: {position.pnl_percentage:.1f}%
-        Days to expiration: {min(c.days_to_expiration for c in position.contracts)}
-        
-        Provide immediate recommendation:
-        1. HOLD - Position is still viable
-        2. CLOSE - Exit immediately
-        3. ADJUST - Modify position parameters
-        4. HEDGE - Add protective position
-        
-        Consider:
-        - Risk of further losses
-        - Time decay acceleration
-        - Volatility impact
-        - Liquidity for exit
-        
-        This is time-sensitive. Provide clear, actionable guidance.
-        """
+        # Reserve queries for emergencies
+        if not await self._reserve_query(self._emergency_reserve):
+            logger.error("Cannot perform emergency analysis - query limit reached")
+            return None
         
         try:
-            response = await self.client.messages.create(
-                model=self.model,
-                max_tokens=1500,
-                temperature=0.2,
-                tools=[{"type": "web_search_20250305", "name": "web_search", "max_uses": 3}],
-                messages=[{"role": "user", "content": prompt}]
-            )
+            try:
+                response = await self.client.messages.create(
+                    model=self.model,
+                    max_tokens=1500,
+                    temperature=self.temperature,
+                    tools=[{"type": "web_search_20250305", "name": "web_search", "max_uses": 3}],
+                    messages=[{"role": "user", "content": prompt}]
+                )
+            except Exception:
+                await self._refund_query()
+                raise
             
             content = self._extract_text_from_response(response)
             decision = self._parse_position_response(content, position.id, position.claude_conversation_id)
-            self.daily_query_count += 1
             
-            logger.warning(f"🚨 Emergency analysis complete with web search. Action: {decision.action if decision else 'None'}")
+            logger.warning("🚨 Emergency analysis complete with web search. Action: %s", decision.action if decision else 'None')
+            if decision:
+                self._store_cached_decision(cache_key, decision)
             return decision
             
         except Exception as e:
-            logger.error(f"❌ Emergency analysis failed: {e}")
+            logger.error("❌ Emergency analysis failed: %s", e)
             return None
     
     async def get_position_management_advice(self, prompt: str) -> Optional[Dict[str, Any]]:
         """Get Claude's advice for position management and exit decisions"""
         try:
+            cache_key = hashlib.sha1(f"{self.model}|{self.temperature}|{prompt}".encode()).digest()
+            cached = self._get_cached_decision(cache_key, _ADVICE_CACHE_TTL_SECONDS)
+            if cached is not None:
+                logger.info("🤖 Reusing Claude position advice from the last %ss: %s", _ADVICE_CACHE_TTL_SECONDS, cached['action'])
+                return dict(cached)
+            
             if not self.client:
                 await self._initialize_client()
             
             response = await self.client.messages.create(
                 model=self.model,
                 max_tokens=1000,
-                temperature=0.3,  # Lower temperature for more consistent decisions
+                temperature=self.temperature,
                 tools=[{"type": "web_search_20250305", "name": "web_search", "max_uses": 2}],
                 messages=[
                     {
@@ -1187,26 +1870,23 @@ JSON only:
             
             # Try to parse JSON response
             try:
-                import json
                 # Extract JSON from response if it's wrapped in other text
-                start_idx = content.find('{')
-                end_idx = content.rfind('}') + 1
+                match = _JSON_RE.search(content)
                 
-                if start_idx >= 0 and end_idx > start_idx:
-                    json_str = content[start_idx:end_idx]
-                    result = json.loads(json_str)
+                if match:
+                    result = orjson.loads(match.group(0))
                     
                     # Validate response structure
                     if 'action' in result and 'reasoning' in result:
-                        logger.info(f"🤖 Claude position advice: {result['action']} ({result.get('confidence', 0):.1%})")
+                        logger.info("🤖 Claude position advice: %s (%.1f%%)", result['action'], result.get('confidence', 0) * 100)
+                        self._store_cached_decision(cache_key, dict(result))
                         return result
                 
             except json.JSONDecodeError:
                 logger.warning("⚠️ Could not parse Claude's JSON response for position management")
             
             # Fallback: try to extract action from text
-            content_lower = content.lower()
-            if 'close' in content_lower or 'sell' in content_lower or 'exit' in content_lower:
+            if _CLOSE_RE.search(content):
                 return {
                     "action": "CLOSE",
                     "confidence": 0.6,
@@ -1220,18 +1900,94 @@ JSON only:
                 }
                 
         except Exception as e:
-            logger.error(f"❌ Claude position management advice failed: {e}")
+            logger.error("❌ Claude position management advice failed: %s", e)
             return {
                 "action": "HOLD",
                 "confidence": 0.5,
                 "reasoning": f"Error in analysis: {str(e)}"
             }
     
+    def _get_cached_decision(self, key: Any, ttl: float) -> Optional[Any]:
+        """Recent cached decision for key, or None once it's older than ttl seconds"""
+        hit = self._decision_cache.get(key)
+        if hit and time.monotonic() - hit[0] < ttl:
+            return hit[1]
+        return None
+    
+    def _store_cached_decision(self, key: Any, decision: Any):
+        """Cache a decision, dropping stale entries once the cache gets large"""
+        now = time.monotonic()
+        if len(self._decision_cache) >= _DECISION_CACHE_MAX_ENTRIES:
+            oldest_allowed = now - max(_ADVICE_CACHE_TTL_SECONDS, _EMERGENCY_CACHE_TTL_SECONDS)
+            self._decision_cache = {k: v for k, v in self._decision_cache.items() if v[0] >= oldest_allowed}
+        self._decision_cache[key] = (now, decision)
+    
+    def _get_thread(self, conversation_id: str) -> Deque[Dict]:
+        """Get or create a conversation thread, evicting the least recently used"""
+        thread = self.conversation_threads.get(conversation_id)
+        if thread is not None:
+            self.conversation_threads.move_to_end(conversation_id)
+            return thread
+        
+        thread = self.conversation_threads[conversation_id] = deque(maxlen=_THREAD_MAX_ENTRIES)
+        if len(self.conversation_threads) > _MAX_CONVERSATION_THREADS:
+            evicted_id, _ = self.conversation_threads.popitem(last=False)
+            logger.info("🧹 Evicted least recently used conversation thread: %s", evicted_id)
+        return thread
+    
+    async def _append_to_thread(self, conversation_id: str, entry: Dict[str, Any]):
+        """Append an exchange, summarizing older turns once the thread exceeds its token budget"""
+        thread = self._get_thread(conversation_id)
+        thread.append(entry)
+        
+        # ~4 characters per token is close enough for a budget check
+        if len(_dumps(list(thread))) // 4 > _THREAD_TOKEN_BUDGET:
+            await self._summarize_thread(conversation_id, thread)
+    
+    async def _summarize_thread(self, conversation_id: str, thread: Deque[Dict]):
+        """Collapse all but the most recent exchanges into a single summary entry"""
+        entries = list(thread)
+        older, recent = entries[:-_THREAD_KEEP_RECENT], entries[-_THREAD_KEEP_RECENT:]
+        if not older:
+            return
+        
+        transcript = []
+        for entry in older:
+            if 'summary' in entry:
+                transcript.append(f"Earlier summary: {entry['summary']}")
+            else:
+                transcript.append(f"Response: {entry['response']}")
+        
+        # Summarizing is another Claude call; without budget left the thread
+        # stays as it is (its deque length still bounds it)
+        if not await self._reserve_query():
+            logger.info("Daily Claude query limit reached - not summarizing conversation %s", conversation_id)
+            return
+        
+        try:
+            response = await self.client.messages.create(
+                model=self.model,
+                max_tokens=500,
+                messages=[{"role": "user", "content": "Summarize the prior turns of this position analysis into at most 400 tokens. "
+                                                      "Keep decisions, key price levels and reasoning.\n\n" + "\n\n".join(transcript)}]
+            )
+            summary = self._extract_text_fast(response)
+        except Exception as e:
+            await self._refund_query()
+            logger.warning("⚠️ Could not summarize conversation %s, dropping older turns: %s", conversation_id, e)
+            summary = None
+        
+        thread.clear()
+        if summary:
+            thread.append({"timestamp": datetime.utcnow(), "summary": summary})
+        thread.extend(recent)
+        logger.info("🗜️ Summarized %s earlier exchanges for conversation %s", len(older), conversation_id)
+    
     def cleanup_conversation(self, conversation_id: str):
         """Clean up conversation thread when position is closed"""
         if conversation_id in self.conversation_threads:
             del self.conversation_threads[conversation_id]
-            logger.info(f"🧹 Cleaned up conversation thread: {conversation_id}")
+            logger.info("🧹 Cleaned up conversation thread: %s", conversation_id)
     
     def reset_daily_count(self):
         """Reset daily query count (called at start of new trading day)"""
@@ -1249,18 +2005,24 @@ JSON only:
             )
             return response.content[0].text
         except Exception as e:
-            logger.error(f"Claude API error ({session_type}): {e}")
+            logger.error("Claude API error (%s): %s", session_type, e)
             raise
     
     async def _query_claude_conversation(self, prompt: str, conversation_id: str) -> str:
         """Query Claude with conversation context"""
         messages = []
+        request_kwargs = {}
         
-        # Add conversation history
-        if conversation_id in self.conversation_threads:
-            for entry in self.conversation_threads[conversation_id][-3:]:  # Last 3 exchanges
-                messages.append({"role": "user", "content": entry["prompt"]})
-                messages.append({"role": "assistant", "content": entry["response"]})
+        # Add conversation history - a summary of older turns rides along as the
+        # system prompt, recent exchanges are replayed as messages
+        thread = self.conversation_threads.get(conversation_id, [])
+        if thread and 'summary' in thread[0]:
+            request_kwargs["system"] = f"Summary of earlier analysis in this conversation:\n{thread[0]['summary']}"
+        # Only Claude's earlier answers are replayed - the prompts were mostly the
+        # same scaffolding the new prompt carries anyway
+        for entry in [e for e in thread if 'response' in e][-3:]:  # Last 3 exchanges
+            messages.append({"role": "user", "content": "previous check-in"})
+            messages.append({"role": "assistant", "content": entry["response"]})
         
         # Add current prompt
         messages.append({"role": "user", "content": prompt})
@@ -1269,346 +2031,320 @@ JSON only:
             response = await self.client.messages.create(
                 model=self.model,
                 max_tokens=self.max_tokens,
-                messages=messages
+                messages=messages,
+                **request_kwargs
             )
             return response.content[0].text
         except Exception as e:
-            logger.error(f"Claude conversation API error: {e}")
+            logger.error("Claude conversation API error: %s", e)
             raise
     
     def _prepare_morning_context(self, portfolio, market_data, earnings_calendar, positions) -> Dict[str, str]:
         """Prepare context for morning session with enhanced performance tracking"""
         return {
-            "portfolio": json.dumps({
-                "total_value": portfolio.total_value,
-                "cash_balance": portfolio.cash_balance,
-                "open_positions": portfolio.open_positions,
-                "total_delta": portfolio.total_delta,
-                "total_vega": portfolio.total_vega,
-                "total_pnl": portfolio.total_pnl,
-                "win_rate": portfolio.win_rate,
-                "max_drawdown": portfolio.max_drawdown
-            }, indent=2),
-            "performance_history": json.dumps({
-                "last_7_days_pnl": portfolio.performance_history.last_7_days_pnl,
-                "last_30_days_pnl": portfolio.performance_history.last_30_days_pnl,
-                "last_60_days_pnl": portfolio.performance_history.last_60_days_pnl,
-                "current_streak": portfolio.performance_history.current_streak,
-                "consecutive_losses": portfolio.performance_history.consecutive_losses,
-                "days_since_last_win": portfolio.performance_history.days_since_last_win,
-                "recent_win_rate": portfolio.performance_history.recent_win_rate,
-                "performance_trend": portfolio.performance_history.performance_trend,
-                "risk_confidence": portfolio.performance_history.risk_confidence,
-                "strategy_performance": portfolio.performance_history.strategy_performance
-            }, indent=2),
-            "risk_assessment": json.dumps({
-                "current_risk_level": portfolio.get_adaptive_risk_level(),
-                "risk_adjusted_confidence": portfolio.risk_adjusted_confidence,
-                "suggested_position_size_multiplier": portfolio.suggested_position_size_multiplier,
-                "portfolio_utilization": portfolio.portfolio_utilization
-            }, indent=2),
-            "market": json.dumps(market_data, indent=2),
-            "earnings": json.dumps(earnings_calendar, indent=2),
-            "positions": json.dumps([{
-                "symbol": p.symbol,
-                "strategy": p.strategy_type,
-                "pnl": p.pnl_percentage,
-                "days_held": p.days_held
-            } for p in positions], indent=2)
+            "portfolio": portfolio.model_dump_json(include=_MORNING_PORTFOLIO_FIELDS, indent=_PROMPT_JSON_INDENT),
+            "performance_history": _dump_performance_history(portfolio.performance_history),
+            "risk_assessment": _dumps(_risk_snapshot(portfolio)),
+            "market": _dumps(market_data),
+            "earnings": _dumps(earnings_calendar),
+            "positions": _dumps([
+                dict(zip(_MORNING_POSITION_KEYS, row)) for row in map(_MORNING_POSITION_FIELDS, positions)
+            ])
         }
     
     def _prepare_position_context(self, position, market_data, portfolio) -> Dict[str, str]:
         """Prepare context for position analysis"""
         return {
-            "position_details": json.dumps({
+            "position_details": _dumps({
                 "symbol": position.symbol,
                 "strategy": position.strategy_type,
                 "entry_cost": position.entry_cost,
                 "current_value": position.current_value,
                 "pnl_pct": position.pnl_percentage,
                 "days_held": position.days_held,
-                "contracts": [c.dict() for c in position.contracts]
-            }, indent=2),
-            "market_analysis": json.dumps(market_data, indent=2),
-            "portfolio_context": json.dumps({
+                "contracts": position.contracts
+            }),
+            "market_analysis": _dumps(market_data),
+            "portfolio_context": _dumps({
                 "total_delta": portfolio.total_delta,
                 "total_vega": portfolio.total_vega,
                 "utilization": portfolio.portfolio_utilization
-            }, indent=2)
+            })
         }
     
     def _parse_morning_response(self, response: str) -> MorningStrategyResponse:
         """Parse Claude's enhanced morning strategy response"""
         try:
-            # Clean response - remove any markdown or extra text
-            cleaned = response.strip()
-            if cleaned.startswith('```json'):
-                cleaned = cleaned[7:]
-            if cleaned.endswith('```'):
-                cleaned = cleaned[:-3]
-            cleaned = cleaned.strip()
+            # Clean response - remove any markdown fence around the JSON
+            fenced = _FENCE_RE.match(response)
+            payload = (fenced.group('body') if fenced else response.strip()).encode()
+            
+            # Bail out before parsing when a required key never appears
+            if not all(key in payload for key in _LIVE_REQUIRED_KEY_BYTES):
+                logger.error("Missing required keys in morning response")
+                return self._create_fallback_response()
             
             # Parse JSON directly
-            data = json.loads(cleaned)
+            data = orjson.loads(payload)
             
             # Validate it's an object with required keys
             if not isinstance(data, dict):
-                logger.error(f"Expected object, got {type(data)}")
+                logger.error("Expected object, got %s", type(data))
                 return self._create_fallback_response()
             
-            required_keys = ['market_assessment', 'cash_strategy', 'opportunities']
-            for key in required_keys:
-                if key not in data:
-                    logger.error(f"Missing required key: {key}")
-                    return self._create_fallback_response()
+            missing = _LIVE_REQUIRED_KEYS - data.keys()
+            if missing:
+                logger.error("Missing required keys: %s", sorted(missing))
+                return self._create_fallback_response()
             
             # Parse and validate the response
             try:
-                morning_response = MorningStrategyResponse(**data)
-                logger.info(f"✅ Parsed enhanced strategy: {len(morning_response.opportunities)} opportunities, "
-                           f"cash strategy: {morning_response.cash_strategy.action}, "
-                           f"market sentiment: {morning_response.market_assessment.overall_sentiment}")
+                morning_response = MorningStrategyResponse.model_validate(data)
+                logger.info("✅ Parsed enhanced strategy: %s opportunities, cash strategy: %s, market sentiment: %s", len(morning_response.opportunities), morning_response.cash_strategy.action, morning_response.market_assessment.overall_sentiment)
                 return morning_response
             except Exception as e:
-                logger.error(f"Failed to validate response structure: {e}")
+                logger.error("Failed to validate response structure: %s", e)
                 return self._create_fallback_response()
             
         except json.JSONDecodeError as e:
-            logger.error(f"JSON parsing failed: {e}")
-            logger.error(f"Response content: {response[:500]}...")
+            logger.error("JSON parsing failed: %s", e)
+            logger.error("Response content: %.500s...", response)
         except Exception as e:
-            logger.error(f"Failed to parse morning response: {e}")
+            logger.error("Failed to parse morning response: %s", e)
         
         return self._create_fallback_response()
     
     def _create_fallback_response(self) -> MorningStrategyResponse:
-        """Create a conservative fallback response when parsing fails"""
-        return MorningStrategyResponse(
-            market_assessment=MarketAssessment(
-                overall_sentiment="uncertain",
-                volatility_environment="elevated",
-                opportunity_quality="poor",
-                recommended_exposure="minimal"
-            ),
-            cash_strategy=CashStrategy(
-                action="hold_cash",
-                reasoning="Unable to parse Claude response - holding cash for safety",
-                target_cash_percentage=90.0,
-                urgency="high"
-            ),
-            opportunities=[]
-        )
+        """Conservative fallback response when parsing fails"""
+        return _FALLBACK_MORNING_RESPONSE
     
     def _parse_position_response(self, response: str, position_id: UUID, conversation_id: str) -> Optional[ClaudeDecision]:
         """Parse Claude's position analysis response"""
         try:
-            # Clean response - remove any markdown or extra text
-            cleaned = response.strip()
-            if cleaned.startswith('```json'):
-                cleaned = cleaned[7:]
-            if cleaned.endswith('```'):
-                cleaned = cleaned[:-3]
-            cleaned = cleaned.strip()
+            # Clean response - remove any markdown fence around the JSON
+            fenced = _FENCE_RE.match(response)
+            payload = (fenced.group('body') if fenced else response.strip()).encode()
+            
+            # Bail out before parsing when a required field never appears
+            if not all(key in payload for key in _POSITION_REQUIRED_KEY_BYTES):
+                logger.error("Missing required fields in position response")
+                return None
             
             # Parse JSON directly
-            data = json.loads(cleaned)
+            data = orjson.loads(payload)
             
             # Validate required fields
-            required_fields = ['action', 'confidence', 'reasoning', 'market_outlook', 
-                             'volatility_assessment', 'risk_assessment']
-            for field in required_fields:
-                if field not in data:
-                    logger.error(f"Missing required field: {field}")
-                    return None
-            
-            # Convert action string to enum
-            try:
-                action = ClaudeActionType(data['action'])
-            except ValueError:
-                logger.error(f"Invalid action: {data['action']}")
+            missing = _POSITION_REQUIRED_KEYS - data.keys()
+            if missing:
+                logger.error("Missing required fields: %s", sorted(missing))
                 return None
             
-            # Create ClaudeDecision object
-            return ClaudeDecision(
-                position_id=position_id,
-                conversation_id=conversation_id,
-                action=action,
-                confidence=float(data['confidence']),
-                reasoning=data['reasoning'],
-                market_outlook=data['market_outlook'],
-                volatility_assessment=data['volatility_assessment'],
-                risk_assessment=data['risk_assessment'],
-                target_price=data.get('target_price'),
-                stop_loss=data.get('stop_loss'),
-                time_horizon=data.get('time_horizon')
-            )
+            # Pydantic coerces the action string and numbers in the same pass
+            # that checks them
+            return ClaudeDecision.model_validate({
+                **{key: data[key] for key in _POSITION_DECISION_KEYS & data.keys()},
+                "position_id": position_id,
+                "conversation_id": conversation_id,
+            })
             
+        except ValidationError as e:
+            logger.error("Invalid position response: %s", e.errors(include_url=False))
         except json.JSONDecodeError as e:
-            logger.error(f"JSON parsing failed: {e}")
-            logger.error(f"Response content: {response[:500]}...")
+            logger.error("JSON parsing failed: %s", e)
+            logger.error("Response content: %.500s...", response)
         except Exception as e:
-            logger.error(f"Failed to parse position response: {e}")
+            logger.error("Failed to parse position response: %s", e)
             
         return None
     
     def _parse_evening_response(self, response: str) -> Dict[str, Any]:
         """Parse Claude's evening review response"""
-        return {
-            "summary": response,
-            "performance_attribution": {},
-            "risk_assessment": {},
-            "tomorrow_strategy": {},
-            "lessons_learned": []
-        }
+        return {"summary": response, **_EVENING_REVIEW_SHELL}
     
-    def _time_since_last_check(self, position: OptionsPosition) -> str:
+    def _time_since_last_check(self, position: OptionsPosition, now: Optional[datetime] = None) -> str:
         """Calculate time since last Claude check"""
         if not position.last_claude_check:
             return "First analysis"
         
-        delta = datetime.utcnow() - position.last_claude_check
-        hours = delta.total_seconds() / 3600
+        hours = ((now or datetime.utcnow()) - position.last_claude_check) / _ONE_HOUR
         return f"{hours:.1f} hours ago"
     
     def _prepare_evening_context(self, portfolio, positions, trades, market) -> Dict[str, str]:
-        """Prepare context for evening review"""
+        """Prepare context for evening review as a single JSON block"""
         return {
-            "performance": json.dumps({
-                "total_pnl": portfolio.total_pnl,
-                "win_rate": portfolio.win_rate,
-                "open_positions": portfolio.open_positions
-            }, indent=2),
-            "positions": json.dumps([{
-                "symbol": p.symbol,
-                "pnl": p.pnl_percentage,
-                "status": p.status
-            } for p in positions], indent=2),
-            "trades": json.dumps(trades, indent=2),
-            "market": json.dumps(market, indent=2)
+            "session": _dumps({
+                "performance": portfolio.model_dump(include=_EVENING_PORTFOLIO_FIELDS),
+                "positions": [
+                    dict(zip(_EVENING_POSITION_KEYS, row)) for row in map(_EVENING_POSITION_FIELDS, positions)
+                ],
+                "trades": trades,
+                "market": market
+            })
         }
     
     def _prepare_emergency_context(self, trigger, position, market_data) -> Dict[str, str]:
         """Prepare context for emergency analysis"""
         return {
-            "position": json.dumps({
+            "position": _dumps({
                 "symbol": position.symbol,
                 "pnl": position.pnl_percentage,
                 "current_value": position.current_value,
-                "days_to_exp": min(c.days_to_expiration for c in position.contracts)
-            }, indent=2),
-            "market": json.dumps(market_data, indent=2)
+                "days_to_exp": position.min_dte
+            }),
+            "market": _dumps(market_data)
         } 
 
-    def _prepare_live_market_context(self, portfolio: PortfolioSummary, market_data: Dict[str, Any], earnings_calendar: List[Dict], positions: List) -> Dict[str, str]:
-        """Prepare comprehensive live market context for Claude analysis"""
-        
-        # Format live market data
-        live_market_summary = f"""
-        REAL-TIME MARKET DATA:
-        • SPY: ${market_data.get('spy_price', 'N/A')} ({market_data.get('spy_change', 0):+.2f}%)
-        • QQQ: ${market_data.get('qqq_price', 'N/A')} ({market_data.get('qqq_change', 0):+.2f}%)
-        • VIX: {market_data.get('vix', 'N/A')} ({market_data.get('vix_change', 0):+.2f}%)
-        • Dollar Index: {market_data.get('dollar_index', 'N/A')}
+    def _live_market_summary(self, market_data: Dict[str, Any]) -> str:
+        """Prose summary of live market data for Claude"""
+        fields = {**_LIVE_MARKET_DEFAULTS, **market_data}
+        fields['market_hours'] = 'OPEN' if market_data.get('market_hours', False) else 'CLOSED'
         
-        MARKET SENTIMENT: {market_data.get('market_sentiment', 'Unknown')}
-        VOLATILITY TREND: {market_data.get('volatility_trend', 'Unknown')}
-        MARKET HOURS: {'OPEN' if market_data.get('market_hours', False) else 'CLOSED'}
-        DATA SOURCE: {market_data.get('data_source', 'Live')}
-        
-        SECTOR PERFORMANCE (Live ETF Data):
-        """
-        
-        # Add sector performance if available
-        sector_performance = market_data.get('sector_performance', {})
-        for sector, performance in sector_performance.items():
-            live_market_summary += f"• {sector}: {performance:+.2f}%\n"
+        parts = [_LIVE_MARKET_HEADER.format_map(fields)]
+        parts.extend(
+            f"• {sector}: {performance:+.2f}%"
+            for sector, performance in market_data.get('sector_performance', {}).items()
+        )
+        parts.append('')
+        return "\n".join(parts)
+    
+    def _live_market_payload(self, portfolio: PortfolioSummary, positions: List) -> Dict[str, Any]:
+        """Portfolio, performance, risk and position sections of the live context"""
+        ph = portfolio.performance_history
+        risk = _risk_snapshot(portfolio)
+        utilization = risk.pop("portfolio_utilization")
+        now = datetime.utcnow()  # entry_date is stored in UTC, as in OptionsPosition.days_held
         
         return {
-            "live_market": live_market_summary,
-            "portfolio": json.dumps({
+            "portfolio": {
                 "total_value": portfolio.total_value,
                 "cash_balance": portfolio.cash_balance,
                 "open_positions": portfolio.open_positions,
                 "total_pnl": portfolio.total_pnl,
                 "win_rate": portfolio.win_rate,
                 "max_drawdown": portfolio.max_drawdown,
-                "portfolio_utilization": portfolio.portfolio_utilization
-            }, indent=2),
-            "performance_history": json.dumps({
-                "current_streak": portfolio.performance_history.current_streak,
-                "consecutive_losses": portfolio.performance_history.consecutive_losses,
-                "days_since_last_win": portfolio.performance_history.days_since_last_win,
-                "recent_win_rate": portfolio.performance_history.recent_win_rate,
-                "last_7_days_pnl": portfolio.performance_history.last_7_days_pnl,
-                "last_30_days_pnl": portfolio.performance_history.last_30_days_pnl,
-                "performance_trend": portfolio.performance_history.performance_trend,
-                "risk_confidence": portfolio.performance_history.risk_confidence
-            }, indent=2),
-            "risk_assessment": json.dumps({
-                "current_risk_level": portfolio.get_adaptive_risk_level(),
-                "risk_adjusted_confidence": portfolio.risk_adjusted_confidence,
-                "suggested_position_size_multiplier": portfolio.suggested_position_size_multiplier,
-                "adaptive_thresholds_active": True
-            }, indent=2),
-            "positions": json.dumps([{
+                "portfolio_utilization": utilization
+            },
+            "performance_history": {
+                "current_streak": ph.current_streak,
+                "consecutive_losses": ph.consecutive_losses,
+                "days_since_last_win": ph.days_since_last_win,
+                "recent_win_rate": ph.recent_win_rate,
+                "last_7_days_pnl": ph.last_7_days_pnl,
+                "last_30_days_pnl": ph.last_30_days_pnl,
+                "performance_trend": ph.performance_trend,
+                "risk_confidence": ph.risk_confidence
+            },
+            "risk_assessment": {**risk, "adaptive_thresholds_active": True},
+            "positions": [{
                 "symbol": p.symbol,
-                "strategy": p.strategy_type.value,
+                "strategy": p.strategy_type,
                 "pnl": getattr(p, 'unrealized_pnl', 0),
-                "days_held": (datetime.now() - p.entry_date).days if hasattr(p, 'entry_date') else 0,
+                "days_held": days,
                 "current_value": getattr(p, 'current_value', 0)
-            } for p in positions], indent=2),
-            "earnings": json.dumps(earnings_calendar, indent=2) if earnings_calendar else "No major earnings this week"
+            } for p, days in zip(positions, _days_held(positions, now))]
         }
     
-    def _parse_live_morning_response(self, content: str) -> Optional[MorningStrategyResponse]:
-        """Parse Claude's live market analysis response"""
+    def _prepare_live_market_context(self, portfolio: PortfolioSummary, market_data: Dict[str, Any], earnings_calendar: List[Dict], positions: List) -> Dict[str, bytes]:
+        """Prepare comprehensive live market context for Claude analysis
+        
+        Values are UTF-8 encoded bytes so they can be joined straight into the
+        request body without a bytes -> str -> bytes round trip.
+        """
+        context = {"live_market": self._live_market_summary(market_data).encode()}
+        for section, value in self._live_market_payload(portfolio, positions).items():
+            context[section] = orjson.dumps(value, default=_orjson_default, option=_PROMPT_JSON_OPTION)
+        context["earnings"] = orjson.dumps(earnings_calendar, default=_orjson_default, option=_PROMPT_JSON_OPTION) if earnings_calendar else b"No major earnings this week"
+        return context
+    
+    def _parse_live_morning_response(self, content: str, defaults_by_symbol: Optional[Dict[str, Dict[str, Any]]] = None) -> Optional[MorningStrategyResponse]:
+        """Parse Claude's live market analysis response
+        
+        defaults_by_symbol supplies per-symbol fields for opportunities that omit them.
+        """
         try:
-            # Extract JSON from response
-            start_idx = content.find('{')
-            end_idx = content.rfind('}') + 1
+            # Extract JSON from response - scan the utf-8 bytes so orjson can
+            # parse the slice directly without another encode
+            match = _JSON_BYTES_RE.search(content.encode('utf-8'))
             
-            if start_idx >= 0 and end_idx > start_idx:
-                json_str = content[start_idx:end_idx]
-                data = json.loads(json_str)
+            if match:
+                payload = match.group(0)
                 
-                # Validate required structure
-                if not all(key in data for key in ['market_assessment', 'cash_strategy', 'opportunities']):
+                # Bail out before parsing when a required key never appears
+                if not all(key in payload for key in _LIVE_REQUIRED_KEY_BYTES):
                     logger.warning("⚠️ Missing required keys in Claude's response")
                     return None
                 
-                # Parse market assessment
-                market_assessment = MarketAssessment(**data['market_assessment'])
-                
-                # Parse cash strategy
-                cash_strategy = CashStrategy(**data['cash_strategy'])
-                
-                # Parse opportunities
-                opportunities = []
-                for opp_data in data['opportunities']:
-                    try:
-                        opportunity = EnhancedOptionsOpportunity(**opp_data)
-                        opportunities.append(opportunity)
-                    except Exception as e:
-                        logger.warning(f"⚠️ Skipping invalid opportunity: {e}")
-                        continue
-                
-                logger.info(f"✅ Successfully parsed {len(opportunities)} live opportunities from Claude")
-                
-                return MorningStrategyResponse(
-                    market_assessment=market_assessment,
-                    cash_strategy=cash_strategy,
-                    opportunities=opportunities
-                )
+                return self._live_morning_response_from_data(orjson.loads(payload), defaults_by_symbol)
                 
             else:
                 logger.warning("⚠️ No valid JSON found in Claude's response")
                 return None
                 
         except json.JSONDecodeError as e:
-            logger.error(f"❌ JSON parsing error in live response: {e}")
+            logger.error("❌ JSON parsing error in live response: %s", e)
             return None
         except Exception as e:
-            logger.error(f"❌ Error parsing live morning response: {e}")
+            logger.error("❌ Error parsing live morning response: %s", e)
+            return None
+    
+    def _live_morning_response_from_data(self, data: Any, defaults_by_symbol: Optional[Dict[str, Dict[str, Any]]] = None) -> Optional[MorningStrategyResponse]:
+        """Build the strategy response from an already-decoded live analysis object
+        
+        defaults_by_symbol supplies per-symbol fields for opportunities that omit them.
+        """
+        try:
+            # Validate required structure
+            if not isinstance(data, dict) or not _LIVE_REQUIRED_KEYS <= data.keys():
+                logger.warning("⚠️ Missing required keys in Claude's response")
+                return None
+            
+            # Parse market assessment
+            market_assessment = MarketAssessment.model_validate(data['market_assessment'])
+            
+            # Parse cash strategy
+            cash_strategy = CashStrategy.model_validate(data['cash_strategy'])
+            
+            # Parse opportunities - validate the whole list at once, only
+            # falling back to per-item handling when something is invalid
+            raw_opportunities = data['opportunities']
+            if defaults_by_symbol and isinstance(raw_opportunities, list):
+                raw_opportunities = [
+                    {**defaults_by_symbol.get(opp.get('symbol'), {}), **opp} if isinstance(opp, dict) else opp
+                    for opp in raw_opportunities
+                ]
+            try:
+                opportunities = _OPPORTUNITIES_ADAPTER.validate_python(raw_opportunities)
+            except ValidationError as e:
+                invalid_indexes = set()
+                for error in e.errors():
+                    if not error['loc']:
+                        # The opportunities value itself is not a list
+                        invalid_indexes = None
+                        break
+                    invalid_indexes.add(error['loc'][0])
+                
+                if invalid_indexes is None:
+                    logger.warning("⚠️ Opportunities is not a list: %s", type(raw_opportunities))
+                    opportunities = []
+                else:
+                    for idx in sorted(invalid_indexes):
+                        logger.warning("⚠️ Skipping invalid opportunity at index %s", idx)
+                    opportunities = [
+                        EnhancedOptionsOpportunity.model_validate(opp_data)
+                        for idx, opp_data in enumerate(raw_opportunities)
+                        if idx not in invalid_indexes
+                    ]
+            
+            logger.info("✅ Successfully parsed %s live opportunities from Claude", len(opportunities))
+            
+            return MorningStrategyResponse(
+                market_assessment=market_assessment,
+                cash_strategy=cash_strategy,
+                opportunities=opportunities
+            )
+            
+        except Exception as e:
+            logger.error("❌ Error parsing live morning response: %s", e)
             return None 
 
     async def _generate_and_save_morning_summary(self, strategy_response: MorningStrategyResponse, portfolio: PortfolioSummary, market_data: Dict[str, Any]):
@@ -1621,30 +2357,29 @@ JSON only:
             
             # Generate a brief summary
             if opportunities_count == 0:
-                summary = f"No trades today - {cash_action.lower()}. Market: {market_sentiment}"
-            elif opportunities_count == 1:
-                summary = f"Found 1 opportunity - {cash_action.lower()}. Market: {market_sentiment}"
+                headline = "No trades today"
             else:
-                summary = f"Found {opportunities_count} opportunities - {cash_action.lower()}. Market: {market_sentiment}"
-            
-            # Save the summary using the claude_summary_manager
-            claude_summary_manager.save_morning_summary(
-                summary=summary,
-                opportunities_count=opportunities_count,
-                market_analysis=f"{market_sentiment} - {strategy_response.market_assessment.volatility_environment}"
-            )
+                headline = f"Found {opportunities_count} opportunit{'y' if opportunities_count == 1 else 'ies'}"
+            summary = f"{headline} - {cash_action.lower()}. Market: {market_sentiment}"
+            
+            # Hand the summary to the background writer
+            _queue_summary("morning", {
+                "summary": summary,
+                "opportunities_count": opportunities_count,
+                "market_analysis": f"{market_sentiment} - {strategy_response.market_assessment.volatility_environment}"
+            })
             
-            logger.info(f"💾 Saved morning summary: {summary}")
+            logger.info("💾 Queued morning summary: %s", summary)
             
         except Exception as e:
-            logger.error(f"❌ Failed to generate morning summary: {e}")
+            logger.error("❌ Failed to generate morning summary: %s", e)
             # Save a fallback summary
             try:
-                claude_summary_manager.save_morning_summary(
-                    summary="Morning analysis completed - check positions for details",
-                    opportunities_count=0,
-                    market_analysis="Analysis completed"
-                )
+                _queue_summary("morning", {
+                    "summary": "Morning analysis completed - check positions for details",
+                    "opportunities_count": 0,
+                    "market_analysis": "Analysis completed"
+                })
             except:
                 pass 
 
@@ -1659,29 +2394,34 @@ JSON only:
             volatility_trend = market_summary.get('volatility_trend', 'Unknown')
             market_hours = market_summary.get('market_hours', 'Unknown')
 
+            # Format the shared pieces once and reuse them in every field
+            pnl_str = f"{total_pnl:,.0f}"
+            win_rate_pct = win_rate * 100
+            outlook = "Market: %s. Volatility: %s. Hours: %s" % (market_sentiment, volatility_trend, market_hours)
+            
             # Generate a brief summary
             if open_positions == 0:
-                summary = f"No open positions. Market: {market_sentiment}. Volatility: {volatility_trend}. Hours: {market_hours}"
+                summary = "No open positions. %s" % outlook
             else:
-                summary = f"Open positions: {open_positions}. Total P&L: ${total_pnl:,.0f}. Win Rate: {win_rate:.1%}. Market: {market_sentiment}. Volatility: {volatility_trend}. Hours: {market_hours}"
+                summary = "Open positions: %d. Total P&L: $%s. Win Rate: %.1f%%. %s" % (open_positions, pnl_str, win_rate_pct, outlook)
             
-            # Save the summary using the claude_summary_manager
-            claude_summary_manager.save_evening_summary(
-                summary=summary,
-                portfolio_performance=f"Total P&L: ${total_pnl:,.0f}, Win Rate: {win_rate:.1%}",
-                next_day_outlook=f"Market: {market_sentiment}. Volatility: {volatility_trend}. Hours: {market_hours}"
-            )
+            # Hand the summary to the background writer
+            _queue_summary("evening", {
+                "summary": summary,
+                "portfolio_performance": "Total P&L: $%s, Win Rate: %.1f%%" % (pnl_str, win_rate_pct),
+                "next_day_outlook": outlook
+            })
             
-            logger.info(f"💾 Saved evening summary: {summary}")
+            logger.info("💾 Queued evening summary: %s", summary)
             
         except Exception as e:
-            logger.error(f"❌ Failed to generate evening summary: {e}")
+            logger.error("❌ Failed to generate evening summary: %s", e)
             # Save a fallback summary
             try:
-                claude_summary_manager.save_evening_summary(
-                    summary="Evening session error - performance data may be incomplete",
-                    portfolio_performance="Unable to analyze due to error",
-                    next_day_outlook="Will retry analysis tomorrow morning"
-                )
+                _queue_summary("evening", {
+                    "summary": "Evening session error - performance data may be incomplete",
+                    "portfolio_performance": "Unable to analyze due to error",
+                    "next_day_outlook": "Will retry analysis tomorrow morning"
+                })
             except:
                 pass 
\ No newline at end of file
@@ -5,17 +5,134 @@ Provides real-time market data from live sources for position valuation and mark
 
 import logging
 import asyncio
-import aiohttp
+import math
+import time
+import httpx
 import yfinance as yf
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional, Any, Tuple
+from datetime import date, datetime, time as dt_time, timedelta
 from dataclasses import dataclass
+from functools import lru_cache, wraps
+import numpy as np
 import pandas as pd
 
 from src.core.config import settings
+from src.core.http_client import get_http_client
+from src.services._market_cache import FileCache
 
 logger = logging.getLogger(__name__)
 
+# Routes build a MarketDataService per request, so quotes and option chains are
+# cached per process: keyed by (kind, symbol) - "symbol:expiration" for chains -
+# stamped with time.monotonic(), and fetched under a per-key lock so concurrent
+# callers share one request
+_QUOTE_TTL_MARKET_HOURS = 5.0
+_QUOTE_TTL_CLOSED = 60.0
+_quote_cache: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+_quote_locks: Dict[Tuple[str, str], asyncio.Lock] = defaultdict(asyncio.Lock)
+# yf.Ticker per symbol with its creation time, shared by the fetchers
+_tickers: Dict[str, Tuple[float, Any]] = {}
+
+# Option chains also persist on disk across restarts, one entry per symbol and
+# listed expiration; intraday entries go stale quickly, after-hours ones last
+# until the next day
+_CHAIN_DISK_TTL_MARKET_HOURS = 300.0
+_CHAIN_DISK_TTL_CLOSED = 24 * 3600.0
+_chain_disk_cache = FileCache(settings.MARKET_CACHE_DIR, ttl=_CHAIN_DISK_TTL_CLOSED)
+
+# Quote columns of yfinance option chains are stored as float32/int32: cents
+# and contract counts fit, and it halves the cached and pickled chain size.
+# Strikes stay float64 since they are matched exactly against position strikes
+_CHAIN_FLOAT32_COLUMNS = ('lastPrice', 'bid', 'ask', 'change', 'percentChange', 'impliedVolatility')
+_CHAIN_INT32_COLUMNS = ('volume', 'openInterest')
+
+def _compact_chain(options: pd.DataFrame) -> pd.DataFrame:
+    """Downcast the quote columns of an option chain DataFrame"""
+    dtypes = {col: np.float32 for col in _CHAIN_FLOAT32_COLUMNS if col in options.columns}
+    counts = [col for col in _CHAIN_INT32_COLUMNS if col in options.columns]
+    # Volume and open interest come back as floats with NaN for untraded strikes
+    options = options.fillna({col: 0 for col in counts})
+    dtypes.update((col, np.int32) for col in counts)
+    return options.astype(dtypes)
+
+def _price_or_none(value: Any) -> Optional[float]:
+    """value as a float if it is a usable price - Yahoo fields can be None, 0 or NaN"""
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return None
+    return price if math.isfinite(price) and price > 0 else None
+
+# VIX classification tables for np.searchsorted(side="right"): a value equal to
+# a bin edge falls in the bucket above it, matching the old `< edge` ladders
+_VIX_BINS = np.array([12, 16, 20, 25, 30, 40], dtype=np.float64)
+_VIX_LABELS = np.array(["Extremely Bullish", "Bullish", "Neutral-Bullish", "Neutral", "Cautious", "Bearish", "Extremely Bearish"])
+_VOL_BINS = np.array([15, 20, 30], dtype=np.float64)
+_VOL_LABELS = np.array(["Low volatility", "Normal volatility", "Elevated volatility", "High volatility"])
+# VIX % change buckets: < -10, [-10, -5), [-5, 5], (5, 10], > 10 - the upper
+# edges are nudged up so the rising side stays strictly greater-than
+_VIX_CHANGE_BINS = np.array([-10, -5, np.nextafter(5, np.inf), np.nextafter(10, np.inf)])
+_VIX_CHANGE_LABELS = np.array(["Collapsing", "Declining", "Stable", "Rising", "Spiking higher"])
+
+# Sentiment labels are recomputed on every market summary poll, but quote
+# caching hands back the same snapshot until it expires, so they are memoized
+# on the exact inputs (classification always uses the raw values)
+@lru_cache(maxsize=4096)
+def _market_sentiment(vix: float, spy_change: float) -> str:
+    # VIX-based sentiment
+    sentiment = str(_VIX_LABELS[np.searchsorted(_VIX_BINS, vix, side="right")])
+    
+    # Adjust based on SPY movement
+    if spy_change > 2.0:
+        sentiment += " (Strong Rally)"
+    elif spy_change < -2.0:
+        sentiment += " (Sharp Decline)"
+    elif abs(spy_change) > 1.0:
+        sentiment += f" ({'Up' if spy_change > 0 else 'Down'} {abs(spy_change):.1f}%)"
+    
+    return sentiment
+
+@lru_cache(maxsize=4096)
+def _volatility_trend(vix: float, vix_change: float) -> str:
+    base = _VOL_LABELS[np.searchsorted(_VOL_BINS, vix, side="right")]
+    return f"{base} - {_VIX_CHANGE_LABELS[np.searchsorted(_VIX_CHANGE_BINS, vix_change, side='right')]}"
+
+_SECTOR_ETFS = {
+    "Technology": "XLK",
+    "Financials": "XLF",
+    "Healthcare": "XLV",
+    "Energy": "XLE",
+    "Utilities": "XLU",
+    "Real Estate": "XLRE",
+    "Materials": "XLB",
+    "Industrials": "XLI",
+    "Consumer Discretionary": "XLY",
+    "Consumer Staples": "XLP",
+    "Communication": "XLC"
+}
+
+# Derived metrics keyed by the (symbol, timestamp) of the snapshots they were
+# computed from. Quote caching hands back the same snapshot until it expires,
+# so repeated summaries reuse the value until a fresh snapshot arrives
+_derived_cache: Dict[str, Tuple[Tuple, Any]] = {}
+
+def _cached_quantity(method):
+    """Memoize a derived metric method until one of its MarketDataPoint inputs changes"""
+    @wraps(method)
+    def wrapper(self, *points: Optional[MarketDataPoint]):
+        inputs = tuple((p.symbol, p.timestamp) if p else None for p in points)
+        hit = _derived_cache.get(method.__name__)
+        if hit and hit[0] == inputs:
+            return hit[1]
+        value = method(self, *points)
+        _derived_cache[method.__name__] = (inputs, value)
+        return value
+    return wrapper
+
+# Always refreshed by update_all_cached_data, whatever else is cached
+_ESSENTIAL_SYMBOLS = frozenset({"SPY", "QQQ", "^VIX", "DX-Y.NYB"})
+
 @dataclass
 class MarketDataPoint:
     """Live market data for a single symbol"""
@@ -57,7 +174,8 @@ class MarketDataService:
         self.market_data_cache: Dict[str, MarketDataPoint] = {}
         self.option_quotes_cache: Dict[str, List[OptionQuote]] = {}
         self.last_update = None
-        self.session = None
+        self.http: Optional[httpx.AsyncClient] = None
+        self._fetch_semaphore = asyncio.Semaphore(settings.LIVE_DATA_MAX_CONCURRENCY)
         
         # API configuration
         self.alpha_vantage_key = settings.ALPHA_VANTAGE_API_KEY if hasattr(settings, 'ALPHA_VANTAGE_API_KEY') else None
@@ -68,48 +186,129 @@ class MarketDataService:
         self.market_open_minute = 30
         self.market_close_hour = 16
         self.market_close_minute = 0
+        # (day, open, close) for the last day is_market_hours saw; open/close are None on weekends
+        self._hours_cache: Tuple[Optional[date], Optional[datetime], Optional[datetime]] = (None, None, None)
     
     async def initialize(self):
-        """Initialize HTTP session for API calls"""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
+        """Attach the shared HTTP connection pool for API calls"""
+        if self.http is None:
+            self.http = get_http_client()
             logger.info("📡 Market data service initialized with live data feeds")
     
     async def close(self):
-        """Close HTTP session"""
-        if self.session:
-            await self.session.close()
+        """Release the HTTP client - the pool itself is shared and closed at shutdown"""
+        self.http = None
     
     def is_market_hours(self) -> bool:
         """Check if market is currently open"""
         now = datetime.now()
+        today = now.date()
         
-        # Check if weekday
-        if now.weekday() >= 5:  # Saturday = 5, Sunday = 6
-            return False
+        cached_day, market_open, market_close = self._hours_cache
+        if cached_day != today:
+            # Session bounds only change with the date (simplified - not accounting for holidays)
+            if today.weekday() >= 5:  # Saturday = 5, Sunday = 6
+                market_open = market_close = None
+            else:
+                market_open = datetime.combine(today, dt_time(self.market_open_hour, self.market_open_minute))
+                market_close = datetime.combine(today, dt_time(self.market_close_hour, self.market_close_minute))
+            self._hours_cache = (today, market_open, market_close)
         
-        # Check time (simplified - not accounting for holidays)
-        market_open = now.replace(hour=self.market_open_hour, minute=self.market_open_minute, second=0)
-        market_close = now.replace(hour=self.market_close_hour, minute=self.market_close_minute, second=0)
+        return market_open is not None and market_open <= now <= market_close
+    
+    def _ticker(self, symbol: str) -> "yf.Ticker":
+        """Shared yf.Ticker for symbol, so the fetchers reuse its session and metadata
         
-        return market_open <= now <= market_close
+        Tickers memoize what they download (info, fast_info), so one is only
+        reused within the quote TTL and prices are no staler than quotes.
+        """
+        now = time.monotonic()
+        hit = _tickers.get(symbol)
+        if hit and now - hit[0] < self._quote_ttl():
+            return hit[1]
+        ticker = yf.Ticker(symbol)
+        _tickers[symbol] = (now, ticker)
+        return ticker
+    
+    def _quote_ttl(self) -> float:
+        """Quote cache lifetime - short while prices are moving"""
+        return _QUOTE_TTL_MARKET_HOURS if self.is_market_hours() else _QUOTE_TTL_CLOSED
+    
+    def _fresh_quote(self, key: Tuple[str, str], ttl: float) -> Optional[Any]:
+        """Cached value for key if it is younger than ttl seconds"""
+        hit = _quote_cache.get(key)
+        if hit and time.monotonic() - hit[0] < ttl:
+            return hit[1]
+        return None
+    
+    async def _cached_quote(self, key: Tuple[str, str], fetch: Callable[[], Awaitable[Any]]) -> Optional[Any]:
+        """Serve key from the quote cache, fetching it once for all waiting callers when stale"""
+        ttl = self._quote_ttl()
+        value = self._fresh_quote(key, ttl)
+        if value is not None:
+            return value
+        
+        async with _quote_locks[key]:
+            # Another caller may have fetched it while we waited
+            value = self._fresh_quote(key, ttl)
+            if value is None:
+                value = await fetch()
+                if value is not None:
+                    _quote_cache[key] = (time.monotonic(), value)
+            return value
+    
+    # yfinance is synchronous (requests under the hood), so every call that hits
+    # the network runs on the default thread pool instead of stalling the loop
+    async def _yf_fast_info(self, ticker: "yf.Ticker", *keys: str) -> Dict[str, Any]:
+        """fast_info fields, each None when Yahoo has no value for it
+        
+        fast_info reads the small chart endpoint (and history for the yearly
+        fields) rather than the full quote-summary payload behind .info.
+        """
+        def read() -> Dict[str, Any]:
+            values = {}
+            for key in keys:
+                try:
+                    values[key] = ticker.fast_info[key]
+                except Exception:
+                    values[key] = None
+            return values
+        return await asyncio.to_thread(read)
+    
+    async def _yf_info(self, ticker: "yf.Ticker") -> Dict[str, Any]:
+        """Full quote-summary payload, empty when Yahoo fails to return it
+        
+        Only read where fast_info falls short - it is the source of the live bid/ask.
+        """
+        try:
+            return await asyncio.to_thread(lambda: ticker.info) or {}
+        except Exception as e:
+            logger.warning(f"⚠️ No quote summary for {ticker.ticker}: {e}")
+            return {}
+    
+    async def _yf_history(self, ticker: "yf.Ticker", **kwargs) -> pd.DataFrame:
+        return await asyncio.to_thread(ticker.history, **kwargs)
     
     async def get_current_price(self, symbol: str) -> Optional[float]:
         """Get live current price for a symbol using Yahoo Finance"""
+        return await self._cached_quote(("price", symbol), lambda: self._fetch_current_price(symbol))
+    
+    async def _fetch_current_price(self, symbol: str) -> Optional[float]:
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
+            ticker = self._ticker(symbol)
+            fast_info = await self._yf_fast_info(ticker, 'last_price', 'previous_close')
             
-            # Try different price fields
-            price = info.get('regularMarketPrice') or info.get('currentPrice') or info.get('previousClose')
+            # Try different price fields - NaN is truthy, so each is checked explicitly
+            price = _price_or_none(fast_info['last_price']) or _price_or_none(fast_info['previous_close'])
             
             if price:
-                return float(price)
+                return price
             
             # Fallback: get from history
-            hist = ticker.history(period="1d", interval="1m")
-            if not hist.empty:
-                return float(hist['Close'].iloc[-1])
+            hist = await self._yf_history(ticker, period="1d", interval="1m")
+            closes = hist['Close'].dropna() if not hist.empty else hist
+            if not closes.empty:
+                return float(closes.iloc[-1])
             
             logger.warning(f"⚠️ No price data available for {symbol}")
             return None
@@ -120,30 +319,43 @@ class MarketDataService:
     
     async def get_market_data(self, symbol: str) -> Optional[MarketDataPoint]:
         """Get complete live market data for a symbol"""
+        market_data = await self._cached_quote(("data", symbol), lambda: self._fetch_market_data(symbol))
+        if market_data:
+            self.market_data_cache[symbol] = market_data
+        return market_data
+    
+    async def _fetch_market_data(self, symbol: str) -> Optional[MarketDataPoint]:
         try:
             await self.initialize()
             
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-            hist = ticker.history(period="2d", interval="1d")
+            ticker = self._ticker(symbol)
+            # The quote summary is the only source of a real bid/ask, so it is
+            # downloaded alongside the daily history rather than after it
+            hist, info = await asyncio.gather(
+                self._yf_history(ticker, period="2d", interval="1d"),
+                self._yf_info(ticker)
+            )
             
-            if hist.empty:
+            closes = hist['Close'].dropna() if not hist.empty else hist
+            if closes.empty:
                 logger.warning(f"⚠️ No historical data for {symbol}")
                 return None
             
-            current_price = float(hist['Close'].iloc[-1])
-            previous_close = float(hist['Close'].iloc[-2]) if len(hist) > 1 else current_price
+            current_price = float(closes.iloc[-1])
+            previous_close = float(closes.iloc[-2]) if len(closes) > 1 else current_price
             
             change_pct = ((current_price - previous_close) / previous_close) * 100 if previous_close > 0 else 0
             
             market_data = MarketDataPoint(
                 symbol=symbol,
                 price=current_price,
-                volume=int(hist['Volume'].iloc[-1]) if 'Volume' in hist.columns else 0,
+                volume=int(hist['Volume'].iloc[-1]) if 'Volume' in hist.columns and not pd.isna(hist['Volume'].iloc[-1]) else 0,
                 change_pct=change_pct,
                 timestamp=datetime.now(),
-                bid=info.get('bid', current_price - 0.01),
-                ask=info.get('ask', current_price + 0.01),
+                # Live quote when Yahoo has one (it reports 0 outside market hours),
+                # otherwise estimated around the close
+                bid=_price_or_none(info.get('bid')) or current_price - 0.01,
+                ask=_price_or_none(info.get('ask')) or current_price + 0.01,
                 implied_volatility=None,  # Would need options data
                 high_52week=info.get('fiftyTwoWeekHigh'),
                 low_52week=info.get('fiftyTwoWeekLow'),
@@ -161,31 +373,66 @@ class MarketDataService:
             logger.error(f"❌ Failed to get live market data for {symbol}: {e}")
             return None
     
-    async def get_option_chain(self, symbol: str) -> Optional[Dict[str, Any]]:
-        """Get live option chain data for a symbol"""
+    async def get_option_expirations(self, symbol: str) -> List[str]:
+        """Listed option expirations for a symbol as ISO dates, nearest first"""
+        return list(await self._cached_quote(("expirations", symbol), lambda: self._fetch_option_expirations(symbol)) or [])
+    
+    async def _fetch_option_expirations(self, symbol: str) -> Optional[Tuple[str, ...]]:
         try:
-            await self.initialize()
-            
-            ticker = yf.Ticker(symbol)
-            
-            # Get available expiration dates
-            expirations = ticker.options
-            
+            expirations = await asyncio.to_thread(lambda: self._ticker(symbol).options)
             if not expirations:
                 logger.warning(f"⚠️ No option expirations available for {symbol}")
+            return tuple(expirations or ())
+        except Exception as e:
+            logger.error(f"❌ Failed to get option expirations for {symbol}: {e}")
+            return None
+    
+    async def get_listed_expiration(self, symbol: str, target: date) -> Optional[str]:
+        """The listed expiration (ISO date) closest to target, or None without listed options"""
+        expirations = await self.get_option_expirations(symbol)
+        if not expirations:
+            return None
+        return min(expirations, key=lambda expiration: abs((date.fromisoformat(expiration) - target).days))
+    
+    async def get_option_chain(self, symbol: str, expiration: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get live option chain data for one listed expiration (ISO date) of a symbol
+        
+        Without an expiration the nearest one is used (usually the most liquid).
+        """
+        if expiration is None:
+            expirations = await self.get_option_expirations(symbol)
+            if not expirations:
                 return None
+            expiration = expirations[0]
+        return await self._cached_quote(("chain", f"{symbol}:{expiration}"), lambda: self._load_option_chain(symbol, expiration))
+    
+    async def _load_option_chain(self, symbol: str, expiration: str) -> Optional[Dict[str, Any]]:
+        """Option chain from the disk cache, downloading it when missing or stale"""
+        key = f"chain:{symbol}:{expiration}"
+        ttl = _CHAIN_DISK_TTL_MARKET_HOURS if self.is_market_hours() else _CHAIN_DISK_TTL_CLOSED
+        
+        option_data = _chain_disk_cache.get(key, ttl)
+        if option_data is None:
+            option_data = await self._fetch_option_chain(symbol, expiration)
+            if option_data is not None:
+                _chain_disk_cache.set(key, option_data)
+        return option_data
+    
+    async def _fetch_option_chain(self, symbol: str, expiration: str) -> Optional[Dict[str, Any]]:
+        try:
+            await self.initialize()
             
-            # Get nearest expiration (usually most liquid)
-            nearest_exp = expirations[0]
-            
-            # Get option chain for nearest expiration
-            opt_chain = ticker.option_chain(nearest_exp)
+            ticker = self._ticker(symbol)
+            opt_chain = await asyncio.to_thread(ticker.option_chain, expiration)
             
-            calls = opt_chain.calls
-            puts = opt_chain.puts
+            calls = _compact_chain(opt_chain.calls)
+            puts = _compact_chain(opt_chain.puts)
             
-            # Get underlying price
-            underlying_price = await self.get_current_price(symbol)
+            # Get underlying price - fast_info reads the last trade from the same Ticker,
+            # skipping the full info download get_current_price would make
+            underlying_price = _price_or_none((await self._yf_fast_info(ticker, 'last_price'))['last_price'])
+            if not underlying_price:
+                underlying_price = await self.get_current_price(symbol)
             
             if underlying_price is None:
                 return None
@@ -193,60 +440,196 @@ class MarketDataService:
             option_data = {
                 "symbol": symbol,
                 "underlying_price": underlying_price,
-                "expiration": nearest_exp,
-                "calls": calls.to_dict('records') if not calls.empty else [],
-                "puts": puts.to_dict('records') if not puts.empty else []
+                "expiration": expiration,
+                # Kept as DataFrames so strike lookups are array operations
+                "calls": calls,
+                "puts": puts
             }
             
-            logger.info(f"📊 Retrieved option chain for {symbol}: {len(calls)} calls, {len(puts)} puts")
+            logger.info(f"📊 Retrieved {expiration} option chain for {symbol}: {len(calls)} calls, {len(puts)} puts")
             
             return option_data
             
         except Exception as e:
-            logger.error(f"❌ Failed to get option chain for {symbol}: {e}")
+            logger.error(f"❌ Failed to get {expiration} option chain for {symbol}: {e}")
             return None
     
-    async def get_option_price(self, symbol: str, strike: float, expiration: datetime, option_type: str) -> Optional[float]:
-        """Get live option price from option chain"""
+    async def get_option_price(self, symbol: str, strike: float, expiration: datetime, option_type: str,
+                               chain_data: Optional[Dict[str, Any]] = None) -> Optional[float]:
+        """Get live option price from the option chain for the contract's expiration
+        
+        Callers already holding the right chain can pass it as chain_data to
+        skip the lookup.
+        """
+        if chain_data is None:
+            leg = (symbol, strike, expiration.date() if isinstance(expiration, datetime) else expiration, option_type)
+            price = (await self.get_option_prices_batch([leg]))[leg]
+        else:
+            price = (await self.get_option_prices(symbol, [(strike, option_type)], chain_data))[0]
+        if price is None:
+            logger.warning(f"⚠️ No matching option found for {symbol} {strike} {option_type}")
+        return price
+    
+    async def get_option_prices(self, symbol: str, queries: List[Tuple[float, str]],
+                                chain_data: Optional[Dict[str, Any]] = None) -> List[Optional[float]]:
+        """Live prices for several (strike, option_type) legs of one symbol from a single chain lookup
+        
+        Each query resolves to the closest listed strike, priced at the last
+        trade, else the bid/ask mid, else the ask. Unpriceable legs are None.
+        """
+        prices: List[Optional[float]] = [None] * len(queries)
         try:
-            # Get option chain data
-            chain_data = await self.get_option_chain(symbol)
-            
-            if not chain_data:
-                return None
-            
-            # Look for matching option in chain
-            options_list = chain_data['calls'] if option_type.lower() == 'call' else chain_data['puts']
-            
-            # Find closest strike match
-            best_match = None
-            min_strike_diff = float('inf')
-            
-            for option in options_list:
-                strike_diff = abs(option.get('strike', 0) - strike)
-                if strike_diff < min_strike_diff:
-                    min_strike_diff = strike_diff
-                    best_match = option
-            
-            if best_match:
-                # Use last price, or average of bid/ask
-                last_price = best_match.get('lastPrice')
-                bid = best_match.get('bid', 0)
-                ask = best_match.get('ask', 0)
+            if chain_data is None:
+                chain_data = await self.get_option_chain(symbol)
+            if not chain_data or not queries:
+                return prices
+            
+            for side, option_type in (('calls', 'call'), ('puts', 'put')):
+                positions = [i for i, (_, kind) in enumerate(queries) if kind.lower() == option_type]
+                options = chain_data[side]
+                if not positions or options.empty:
+                    continue
+                
+                order = np.argsort(options['strike'].to_numpy(), kind='stable')
+                strikes = options['strike'].to_numpy()[order]
+                requested = np.array([queries[i][0] for i in positions], dtype=np.float64)
                 
-                if last_price and last_price > 0:
-                    return float(last_price)
-                elif bid > 0 and ask > 0:
-                    return float((bid + ask) / 2)
-                elif ask > 0:
-                    return float(ask)
+                # Closest strike from its two sorted neighbours, ties going to the lower one
+                right = np.clip(np.searchsorted(strikes, requested), 0, len(strikes) - 1)
+                left = np.clip(right - 1, 0, len(strikes) - 1)
+                nearest = np.where(np.abs(strikes[right] - requested) < np.abs(requested - strikes[left]), right, left)
+                rows = order[nearest]
+                
+                last = options['lastPrice'].to_numpy(np.float64)[rows]
+                bid = options['bid'].to_numpy(np.float64)[rows]
+                ask = options['ask'].to_numpy(np.float64)[rows]
+                price = np.where(last > 0, last,
+                                 np.where((bid > 0) & (ask > 0), (bid + ask) / 2,
+                                          np.where(ask > 0, ask, np.nan)))
+                # Mid prices can land on half cents; quote at cent precision
+                price = np.round(price, 2)
+                
+                for i, value in zip(positions, price.tolist()):
+                    if not np.isnan(value):
+                        prices[i] = value
             
-            logger.warning(f"⚠️ No matching option found for {symbol} {strike} {option_type}")
-            return None
+            return prices
             
         except Exception as e:
-            logger.error(f"❌ Failed to get live option price: {e}")
-            return None
+            logger.error(f"❌ Failed to get live option prices for {symbol}: {e}")
+            return prices
+    
+    async def get_option_prices_batch(self, requests: List[Tuple[str, float, date, str]]) -> Dict[Tuple[str, float, date, str], Optional[float]]:
+        """Live prices for (symbol, strike, expiration, option_type) legs across symbols
+        
+        Identical legs are priced once and each (symbol, expiration) chain is
+        loaded once, with the chains fetched concurrently. Legs on an expiration
+        the symbol doesn't list come back as None.
+        """
+        by_chain: Dict[Tuple[str, date], List[Tuple[str, float, date, str]]] = defaultdict(list)
+        for request in dict.fromkeys(requests):
+            by_chain[(request[0], request[2])].append(request)
+        
+        async def price_chain(symbol: str, expiration: date, legs: List[Tuple[str, float, date, str]]) -> List[Optional[float]]:
+            async with self._fetch_semaphore:
+                # Checked first so an unlisted date doesn't cost a failing download
+                if expiration.isoformat() not in await self.get_option_expirations(symbol):
+                    return [None] * len(legs)
+                chain_data = await self.get_option_chain(symbol, expiration.isoformat())
+            if not chain_data:
+                return [None] * len(legs)
+            return await self.get_option_prices(symbol, [(leg[1], leg[3]) for leg in legs], chain_data)
+        
+        chains = list(by_chain)
+        fetched = await asyncio.gather(*(price_chain(symbol, expiration, by_chain[(symbol, expiration)]) for symbol, expiration in chains), return_exceptions=True)
+        
+        results: Dict[Tuple[str, float, date, str], Optional[float]] = {}
+        for (symbol, expiration), prices in zip(chains, fetched):
+            if isinstance(prices, BaseException):
+                logger.error(f"❌ Failed to get live option prices for {symbol} {expiration}: {prices}")
+                prices = [None] * len(by_chain[(symbol, expiration)])
+            results.update(zip(by_chain[(symbol, expiration)], prices))
+        return results
+    
+    async def get_market_data_batch(self, symbols: List[str]) -> Dict[str, MarketDataPoint]:
+        """Get daily price data for several symbols from one Yahoo download
+        
+        The download carries no quote fields, so bid/ask are the same estimate
+        around the close that get_market_data falls back to, and the 52-week
+        range and average volume are left unset.
+        """
+        if not symbols:
+            return {}
+        
+        try:
+            data = await asyncio.to_thread(
+                yf.download, symbols, period="2d", interval="1d",
+                group_by='ticker', threads=True, progress=False
+            )
+        except Exception as e:
+            logger.error(f"❌ Batch download failed for {len(symbols)} symbols: {e}")
+            return {}
+        
+        if data is None or data.empty:
+            logger.warning(f"⚠️ Batch download returned no data for {len(symbols)} symbols")
+            return {}
+        
+        now = datetime.now()
+        results = {}
+        for symbol in symbols:
+            try:
+                frame = data[symbol] if isinstance(data.columns, pd.MultiIndex) else data
+                closes = frame['Close'].dropna()
+            except KeyError:
+                continue
+            if closes.empty:
+                continue
+            
+            current_price = float(closes.iloc[-1])
+            previous_close = float(closes.iloc[-2]) if len(closes) > 1 else current_price
+            change_pct = ((current_price - previous_close) / previous_close) * 100 if previous_close > 0 else 0
+            volumes = frame['Volume'].dropna() if 'Volume' in frame.columns else None
+            
+            market_data = MarketDataPoint(
+                symbol=symbol,
+                price=current_price,
+                volume=int(volumes.iloc[-1]) if volumes is not None and not volumes.empty else 0,
+                change_pct=change_pct,
+                timestamp=now,
+                bid=current_price - 0.01,
+                ask=current_price + 0.01
+            )
+            self.market_data_cache[symbol] = market_data
+            _quote_cache[("data", symbol)] = (time.monotonic(), market_data)
+            results[symbol] = market_data
+        
+        logger.debug(f"📊 Batch download covered {len(results)}/{len(symbols)} symbols")
+        return results
+    
+    async def get_market_data_many(self, symbols: List[str]) -> Dict[str, Optional[MarketDataPoint]]:
+        """Fetch market data for several symbols, batched into one download
+        
+        Symbols with a fresh cached quote skip the download, and symbols the
+        download misses are fetched individually and concurrently.
+        """
+        ttl = self._quote_ttl()
+        results: Dict[str, Optional[MarketDataPoint]] = {}
+        for symbol in symbols:
+            cached = self._fresh_quote(("data", symbol), ttl)
+            if cached is not None:
+                results[symbol] = cached
+        
+        results.update(await self.get_market_data_batch([symbol for symbol in symbols if symbol not in results]))
+        missing = [symbol for symbol in symbols if symbol not in results]
+        
+        async def fetch(symbol: str) -> Optional[MarketDataPoint]:
+            async with self._fetch_semaphore:
+                return await self.get_market_data(symbol)
+        
+        fetched = await asyncio.gather(*(fetch(symbol) for symbol in missing), return_exceptions=True)
+        for symbol, result in zip(missing, fetched):
+            results[symbol] = None if isinstance(result, BaseException) else result
+        return results
     
     async def get_vix_level(self) -> float:
         """Get current VIX level"""
@@ -259,11 +642,15 @@ class MarketDataService:
     async def get_market_summary(self) -> Dict[str, Any]:
         """Get comprehensive live market summary"""
         try:
-            # Get key market indicators
-            spy_data = await self.get_market_data("SPY")
-            qqq_data = await self.get_market_data("QQQ")
-            vix_data = await self.get_market_data("^VIX")
-            dxy_data = await self.get_market_data("DX-Y.NYB")  # Dollar index
+            # Get key market indicators, alongside the sector ETFs
+            indicators, sector_performance = await asyncio.gather(
+                self.get_market_data_many(["SPY", "QQQ", "^VIX", "DX-Y.NYB"]),  # DX-Y.NYB = Dollar index
+                self._get_sector_performance()
+            )
+            spy_data = indicators["SPY"]
+            qqq_data = indicators["QQQ"]
+            vix_data = indicators["^VIX"]
+            dxy_data = indicators["DX-Y.NYB"]
             
             # Determine market sentiment based on real data
             market_sentiment = self._analyze_market_sentiment(spy_data, vix_data)
@@ -282,7 +669,7 @@ class MarketDataService:
                 "market_hours": self.is_market_hours(),
                 "last_updated": datetime.now().isoformat(),
                 "data_source": "Live Yahoo Finance",
-                "sector_performance": await self._get_sector_performance()
+                "sector_performance": sector_performance
             }
             
         except Exception as e:
@@ -293,91 +680,30 @@ class MarketDataService:
         """Analyze market sentiment from live data"""
         if not spy_data or not vix_data:
             return "Unknown"
-        
-        # VIX-based sentiment
-        if vix_data.price < 12:
-            sentiment = "Extremely Bullish"
-        elif vix_data.price < 16:
-            sentiment = "Bullish"
-        elif vix_data.price < 20:
-            sentiment = "Neutral-Bullish"
-        elif vix_data.price < 25:
-            sentiment = "Neutral"
-        elif vix_data.price < 30:
-            sentiment = "Cautious"
-        elif vix_data.price < 40:
-            sentiment = "Bearish"
-        else:
-            sentiment = "Extremely Bearish"
-        
-        # Adjust based on SPY movement
-        if spy_data.change_pct > 2.0:
-            sentiment += " (Strong Rally)"
-        elif spy_data.change_pct < -2.0:
-            sentiment += " (Sharp Decline)"
-        elif abs(spy_data.change_pct) > 1.0:
-            sentiment += f" ({'Up' if spy_data.change_pct > 0 else 'Down'} {abs(spy_data.change_pct):.1f}%)"
-        
-        return sentiment
+        return _market_sentiment(vix_data.price, spy_data.change_pct)
     
     def _analyze_volatility_trend(self, vix_data: Optional[MarketDataPoint]) -> str:
         """Analyze volatility trend"""
         if not vix_data:
             return "Unknown"
-        
-        vix_level = vix_data.price
-        vix_change = vix_data.change_pct
-        
-        if vix_level < 15:
-            base = "Low volatility"
-        elif vix_level < 20:
-            base = "Normal volatility"
-        elif vix_level < 30:
-            base = "Elevated volatility"
-        else:
-            base = "High volatility"
-        
-        if vix_change > 10:
-            trend = f"{base} - Spiking higher"
-        elif vix_change > 5:
-            trend = f"{base} - Rising"
-        elif vix_change < -10:
-            trend = f"{base} - Collapsing"
-        elif vix_change < -5:
-            trend = f"{base} - Declining"
-        else:
-            trend = f"{base} - Stable"
-        
-        return trend
+        return _volatility_trend(vix_data.price, vix_data.change_pct)
     
     async def _get_sector_performance(self) -> Dict[str, float]:
         """Get live sector ETF performance"""
-        sector_etfs = {
-            "Technology": "XLK",
-            "Financials": "XLF", 
-            "Healthcare": "XLV",
-            "Energy": "XLE",
-            "Utilities": "XLU",
-            "Real Estate": "XLRE",
-            "Materials": "XLB",
-            "Industrials": "XLI",
-            "Consumer Discretionary": "XLY",
-            "Consumer Staples": "XLP",
-            "Communication": "XLC"
-        }
-        
-        sector_performance = {}
-        
         try:
-            for sector, etf in sector_etfs.items():
-                data = await self.get_market_data(etf)
-                if data:
-                    sector_performance[sector] = data.change_pct
-                    
+            etf_data = await self.get_market_data_many(list(_SECTOR_ETFS.values()))
+            return dict(self._sector_changes(*(etf_data[etf] for etf in _SECTOR_ETFS.values())))
         except Exception as e:
             logger.error(f"❌ Failed to get sector performance: {e}")
-        
-        return sector_performance
+            return {}
+    
+    @_cached_quantity
+    def _sector_changes(self, *etf_data: Optional[MarketDataPoint]) -> Dict[str, float]:
+        """Daily change per sector, from ETF snapshots in _SECTOR_ETFS order"""
+        return {
+            sector: data.change_pct
+            for sector, data in zip(_SECTOR_ETFS, etf_data) if data
+        }
     
     async def get_earnings_calendar(self, days_ahead: int = 7) -> List[Dict[str, Any]]:
         """Get earnings calendar for next N days (simplified - would integrate with real earnings API)"""
@@ -394,20 +720,11 @@ class MarketDataService:
     async def update_all_cached_data(self):
         """Update all cached market data with live feeds"""
         try:
-            # Get list of symbols from existing cache
-            symbols_to_update = list(self.market_data_cache.keys())
-            
-            # Add essential market symbols if not present
-            essential_symbols = ["SPY", "QQQ", "^VIX", "DX-Y.NYB"]
-            for symbol in essential_symbols:
-                if symbol not in symbols_to_update:
-                    symbols_to_update.append(symbol)
-            
-            update_count = 0
-            for symbol in symbols_to_update:
-                data = await self.get_market_data(symbol)
-                if data:
-                    update_count += 1
+            # Symbols from existing cache plus the essential market symbols
+            symbols_to_update = self.market_data_cache.keys() | _ESSENTIAL_SYMBOLS
+            
+            results = await self.get_market_data_many(list(symbols_to_update))
+            update_count = sum(1 for data in results.values() if data)
             
             self.last_update = datetime.now()
             logger.info(f"📊 Updated {update_count} symbols with live market data")
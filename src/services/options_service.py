@@ -4,19 +4,40 @@ Handles options execution, Greeks calculation, position management, auto-trading
 """
 
 import logging
-from typing import List, Optional, Dict, Any
+from operator import attrgetter
+from typing import List, Optional, Dict, Any, Tuple
+
+import numpy as np
+import pandas as pd
 from uuid import UUID, uuid4
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from sqlalchemy.orm import Session
 
 from src.models.options import OptionsPosition, OptionContract, PortfolioSummary, StrategyType, PositionDB, PerformanceHistory
 from src.core.config import settings
 from src.core.database import get_db
 from src.services.market_data_service import MarketDataService
-from sqlalchemy import select
+from src.services._option_pricing import bsm_price_and_greeks
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
 
+# Paper-trading price jitter when no option quote is available
+_RNG = np.random.default_rng()
+
+# Columns _write_position refreshes on an existing row
+_UPDATED_COLUMNS = (
+    'status', 'current_value', 'realized_pnl', 'unrealized_pnl', 'exit_date', 'last_claude_check',
+    'portfolio_delta', 'portfolio_gamma', 'portfolio_theta', 'portfolio_vega', 'position_metadata',
+)
+
+# Numeric OptionsPosition fields gathered into arrays for portfolio roll-ups
+_POSITION_COLUMNS = (
+    'entry_cost', 'current_value', 'realized_pnl', 'unrealized_pnl',
+    'portfolio_delta', 'portfolio_gamma', 'portfolio_theta', 'portfolio_vega',
+)
+
 class OptionsService:
     """Options trading service with paper trading support, autonomous execution, and database persistence"""
     
@@ -101,59 +122,19 @@ class OptionsService:
             logger.error(f"❌ Failed to convert database position to model: {e}")
             return None
     
-    async def _save_position_to_db(self, position: OptionsPosition):
-        """Save position to database"""
+    async def _save_position_to_db(self, position: OptionsPosition, db: Optional[AsyncSession] = None):
+        """Save position to database
+        
+        With a session passed in, the write joins the caller's transaction and
+        committing is left to the caller, so several saves can share one commit.
+        """
+        if db is not None:
+            await self._write_position(db, position)
+            return
+        
         try:
             async for db in get_db():
-                # Check if position already exists
-                result = await db.execute(select(PositionDB).where(PositionDB.id == position.id))
-                existing = result.scalar_one_or_none()
-                
-                if existing:
-                    # Update existing position
-                    existing.status = position.status
-                    existing.current_value = position.current_value
-                    existing.realized_pnl = position.realized_pnl
-                    existing.unrealized_pnl = position.unrealized_pnl
-                    existing.exit_date = position.exit_date
-                    existing.last_claude_check = position.last_claude_check
-                    existing.portfolio_delta = position.portfolio_delta
-                    existing.portfolio_gamma = position.portfolio_gamma
-                    existing.portfolio_theta = position.portfolio_theta
-                    existing.portfolio_vega = position.portfolio_vega
-                    existing.position_metadata = getattr(position, 'position_metadata', {})
-                    logger.info(f"💾 Updated position in database: {position.symbol}")
-                else:
-                    # Create new position
-                    contracts_data = [contract.dict() for contract in position.contracts]
-                    
-                    db_position = PositionDB(
-                        id=position.id,
-                        strategy_type=position.strategy_type.value,
-                        status=position.status,
-                        symbol=position.symbol,
-                        quantity=position.quantity,
-                        entry_date=position.entry_date,
-                        exit_date=position.exit_date,
-                        entry_cost=position.entry_cost,
-                        current_value=position.current_value,
-                        realized_pnl=position.realized_pnl,
-                        unrealized_pnl=position.unrealized_pnl,
-                        claude_conversation_id=position.claude_conversation_id,
-                        last_claude_check=position.last_claude_check,
-                        max_loss=position.max_loss,
-                        profit_target=position.profit_target,
-                        portfolio_delta=position.portfolio_delta,
-                        portfolio_gamma=position.portfolio_gamma,
-                        portfolio_theta=position.portfolio_theta,
-                        portfolio_vega=position.portfolio_vega,
-                        contracts_data=contracts_data,
-                        position_metadata=getattr(position, 'position_metadata', {})
-                    )
-                    
-                    db.add(db_position)
-                    logger.info(f"💾 Saved new position to database: {position.symbol}")
-                
+                await self._write_position(db, position)
                 await db.commit()
                 break  # Only need one database session
                 
@@ -164,29 +145,129 @@ class OptionsService:
             except:
                 pass
     
+    async def _write_position(self, db: AsyncSession, position: OptionsPosition):
+        """Insert or update a position row in the session without committing"""
+        row = self._position_row(position)
+        
+        # Check if position already exists
+        result = await db.execute(select(PositionDB).where(PositionDB.id == position.id))
+        existing = result.scalar_one_or_none()
+        
+        if existing:
+            # Update existing position
+            for column in _UPDATED_COLUMNS:
+                setattr(existing, column, row[column])
+            logger.info(f"💾 Updated position in database: {position.symbol}")
+        else:
+            # Create new position
+            db.add(PositionDB(**row))
+            logger.info(f"💾 Saved new position to database: {position.symbol}")
+    
+    async def _bulk_update_position_marks(self, positions: List[OptionsPosition]):
+        """Persist revalued marks for several positions in one UPDATE and commit
+        
+        Uses SQLAlchemy's bulk UPDATE by primary key, so the rows are written
+        without loading them first.
+        """
+        if not positions:
+            return
+        
+        rows = [
+            {
+                "id": position.id,
+                "current_value": position.current_value,
+                "unrealized_pnl": position.unrealized_pnl,
+                "portfolio_delta": position.portfolio_delta,
+                "portfolio_gamma": position.portfolio_gamma,
+                "portfolio_theta": position.portfolio_theta,
+                "portfolio_vega": position.portfolio_vega,
+            }
+            for position in positions
+        ]
+        try:
+            async for db in get_db():
+                await db.execute(update(PositionDB), rows)
+                await db.commit()
+                logger.info(f"💾 Updated {len(rows)} positions in database")
+                break  # Only need one database session
+                
+        except Exception as e:
+            logger.error(f"❌ Failed to bulk update positions in database: {e}")
+            try:
+                await db.rollback()
+            except:
+                pass
+    
+    def _position_row(self, position: OptionsPosition) -> Dict[str, Any]:
+        """Column values for a positions table row"""
+        return {
+            "id": position.id,
+            "strategy_type": position.strategy_type.value,
+            "status": position.status,
+            "symbol": position.symbol,
+            "quantity": position.quantity,
+            "entry_date": position.entry_date,
+            "exit_date": position.exit_date,
+            "entry_cost": position.entry_cost,
+            "current_value": position.current_value,
+            "realized_pnl": position.realized_pnl,
+            "unrealized_pnl": position.unrealized_pnl,
+            "claude_conversation_id": position.claude_conversation_id,
+            "last_claude_check": position.last_claude_check,
+            "max_loss": position.max_loss,
+            "profit_target": position.profit_target,
+            "portfolio_delta": position.portfolio_delta,
+            "portfolio_gamma": position.portfolio_gamma,
+            "portfolio_theta": position.portfolio_theta,
+            "portfolio_vega": position.portfolio_vega,
+            # JSON mode so expiration dates are stored as ISO strings in JSONB
+            "contracts_data": [contract.model_dump(mode="json") for contract in position.contracts],
+            "position_metadata": getattr(position, 'position_metadata', {}),
+        }
+    
+    def _position_columns(self, positions: List[OptionsPosition]) -> Dict[str, np.ndarray]:
+        """Hot numeric position fields as contiguous arrays, one row per position
+        
+        Portfolio roll-ups then become masked array sums rather than repeated
+        attribute walks over the position models.
+        """
+        n = len(positions)
+        columns = {
+            name: np.fromiter(map(attrgetter(name), positions), np.float64, n)
+            for name in _POSITION_COLUMNS
+        }
+        status = np.array([pos.status for pos in positions], dtype=object)
+        columns['open'] = status == "open"
+        columns['closed'] = status == "closed"
+        return columns
+    
     async def _recalculate_portfolio_from_positions(self):
         """Recalculate portfolio value and cash balance from actual positions"""
-        total_position_value = sum(pos.current_value for pos in self.positions.values() if pos.status == "open")
-        total_realized_pnl = sum(pos.realized_pnl for pos in self.positions.values() if pos.status == "closed")
+        columns = self._position_columns(list(self.positions.values()))
+        is_open, is_closed = columns['open'], columns['closed']
+        total_realized_pnl = float(columns['realized_pnl'][is_closed].sum())
         
         # Calculate current portfolio value
-        self.portfolio_value = 100000.0 + total_realized_pnl + sum(pos.unrealized_pnl for pos in self.positions.values() if pos.status == "open")
+        self.portfolio_value = 100000.0 + total_realized_pnl + float(columns['unrealized_pnl'][is_open].sum())
         
         # Calculate available cash (starting cash - position costs + realized gains/losses)
-        total_position_costs = sum(pos.entry_cost for pos in self.positions.values() if pos.status == "open")
+        total_position_costs = float(columns['entry_cost'][is_open].sum())
         self.cash_balance = 100000.0 - total_position_costs + total_realized_pnl
         
-        logger.info(f"📊 Portfolio recalculated: Value=${self.portfolio_value:,.0f}, Cash=${self.cash_balance:,.0f}, Positions={len([p for p in self.positions.values() if p.status == 'open'])}")
+        logger.info(f"📊 Portfolio recalculated: Value=${self.portfolio_value:,.0f}, Cash=${self.cash_balance:,.0f}, Positions={int(is_open.sum())}")
     
     async def get_portfolio_summary(self) -> PortfolioSummary:
         """Get current portfolio summary with real position data"""
         await self.initialize()  # Ensure positions are loaded
         
         # Calculate real metrics from actual positions
-        open_positions = [pos for pos in self.positions.values() if pos.status == "open"]
-        closed_positions = [pos for pos in self.positions.values() if pos.status == "closed"]
+        positions = list(self.positions.values())
+        columns = self._position_columns(positions)
+        is_open, is_closed = columns['open'], columns['closed']
+        closed_positions = [pos for pos, closed in zip(positions, is_closed.tolist()) if closed]
+        closed_pnl = columns['realized_pnl'][is_closed]
         
-        total_pnl = sum(pos.realized_pnl for pos in closed_positions) + sum(pos.unrealized_pnl for pos in open_positions)
+        total_pnl = float(closed_pnl.sum() + columns['unrealized_pnl'][is_open].sum())
         
         # Calculate win rate from actual trading history
         win_rate = 0.0
@@ -195,22 +276,19 @@ class OptionsService:
         max_drawdown = 0.0
         
         if closed_positions:
-            winning_trades = [pos for pos in closed_positions if pos.realized_pnl > 0]
-            losing_trades = [pos for pos in closed_positions if pos.realized_pnl < 0]
-            
-            win_rate = (len(winning_trades) / len(closed_positions)) * 100
-            average_win = sum(pos.realized_pnl for pos in winning_trades) / len(winning_trades) if winning_trades else 0
-            average_loss = sum(pos.realized_pnl for pos in losing_trades) / len(losing_trades) if losing_trades else 0
-            
-            # Calculate max drawdown (simplified)
-            running_total = 0
-            peak = 0
-            max_dd = 0
-            for pos in sorted(closed_positions, key=lambda x: x.exit_date or datetime.now()):
-                running_total += pos.realized_pnl
-                peak = max(peak, running_total)
-                drawdown = peak - running_total
-                max_dd = max(max_dd, drawdown)
+            wins = closed_pnl[closed_pnl > 0]
+            losses = closed_pnl[closed_pnl < 0]
+            
+            win_rate = (wins.size / closed_pnl.size) * 100
+            average_win = float(wins.mean()) if wins.size else 0
+            average_loss = float(losses.mean()) if losses.size else 0
+            
+            # Calculate max drawdown (simplified): running P&L in exit order against its peak, floored at 0
+            now = datetime.now()
+            exit_order = np.argsort([pos.exit_date or now for pos in closed_positions], kind="stable")
+            running_total = np.cumsum(closed_pnl[exit_order])
+            peak = np.maximum(np.maximum.accumulate(running_total), 0)
+            max_dd = max(float((peak - running_total).max()), 0)
             
             max_drawdown = (max_dd / 100000.0) * 100 if max_dd > 0 else 0  # As percentage
         
@@ -221,15 +299,15 @@ class OptionsService:
             total_value=self.portfolio_value,
             cash_balance=self.cash_balance,
             total_pnl=total_pnl,
-            open_positions=len(open_positions),
+            open_positions=int(is_open.sum()),
             win_rate=win_rate,
             average_win=average_win,
             average_loss=average_loss,
             max_drawdown=max_drawdown,
-            total_delta=sum(pos.portfolio_delta for pos in open_positions),
-            total_gamma=sum(pos.portfolio_gamma for pos in open_positions),
-            total_theta=sum(pos.portfolio_theta for pos in open_positions),
-            total_vega=sum(pos.portfolio_vega for pos in open_positions),
+            total_delta=float(columns['portfolio_delta'][is_open].sum()),
+            total_gamma=float(columns['portfolio_gamma'][is_open].sum()),
+            total_theta=float(columns['portfolio_theta'][is_open].sum()),
+            total_vega=float(columns['portfolio_vega'][is_open].sum()),
             performance_history=performance_history
         )
     
@@ -378,31 +456,104 @@ class OptionsService:
     async def update_position_values(self):
         """Update current values for all open positions using real market data"""
         try:
-            updated_count = 0
+            changed = []
             
-            for position in self.positions.values():
-                if position.status == "open":
-                    # Get real market data for the underlying symbol
-                    new_value = await self._calculate_position_value(position)
-                    
-                    if new_value is not None:
-                        old_value = position.current_value
-                        position.current_value = new_value
-                        position.unrealized_pnl = new_value - position.entry_cost
-                        
-                        # Save to database if significant change
-                        if abs(new_value - old_value) > 10:  # Only save if change > $10
-                            await self._save_position_to_db(position)
-                            updated_count += 1
-                            
-                            logger.debug(f"📊 Updated {position.symbol}: ${new_value:,.0f} (P&L: ${position.unrealized_pnl:+,.0f})")
-            
-            if updated_count > 0:
-                logger.info(f"📊 Updated {updated_count} position values using market data")
+            for position, old_value in await self.revalue_all():
+                new_value = position.current_value
+                
+                # Save to database if significant change
+                if abs(new_value - old_value) > 10:  # Only save if change > $10
+                    changed.append(position)
+                    logger.debug(f"📊 Updated {position.symbol}: ${new_value:,.0f} (P&L: ${position.unrealized_pnl:+,.0f})")
+            
+            # One bulk write and commit for the whole cycle
+            await self._bulk_update_position_marks(changed)
+            
+            if changed:
+                logger.info(f"📊 Updated {len(changed)} position values using market data")
                 
         except Exception as e:
             logger.error(f"❌ Failed to update position values: {e}")
     
+    async def revalue_all(self) -> List[Tuple[OptionsPosition, float]]:
+        """Re-mark every open position in memory: value, unrealized P&L and Greeks
+        
+        Nothing is persisted, so this is cheap enough to run every tick. Returns
+        the revalued positions paired with their previous value.
+        """
+        open_positions = [pos for pos in self.positions.values() if pos.status == "open"]
+        priced, totals = await self._revalue_positions(open_positions)
+        columns = {name: totals[name].tolist() for name in totals}
+        
+        revalued = []
+        for i in np.flatnonzero(priced).tolist():
+            position = open_positions[i]
+            revalued.append((position, position.current_value))
+            position.current_value = columns['value'][i]
+            position.unrealized_pnl = position.current_value - position.entry_cost
+            position.portfolio_delta = columns['delta'][i]
+            position.portfolio_gamma = columns['gamma'][i]
+            position.portfolio_theta = columns['theta'][i]
+            position.portfolio_vega = columns['vega'][i]
+        return revalued
+    
+    async def _revalue_positions(self, positions: List[OptionsPosition]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Value positions from live option quotes, falling back to Black-Scholes per leg
+        
+        One vectorized model pass over every leg supplies the Greeks and the
+        price of legs without a quote. Returns a mask of the positions that
+        could be priced (those with legs and an underlying price) and
+        per-position totals: value in dollars, and delta/gamma/theta/vega
+        weighted by contract quantity.
+        """
+        n = len(positions)
+        priced = np.zeros(n, np.bool_)
+        totals = {name: np.zeros(n) for name in ('value', 'delta', 'gamma', 'theta', 'vega')}
+        if not positions:
+            return priced, totals
+        
+        symbols = list({pos.symbol for pos in positions})
+        quotes = await self.market_data_service.get_market_data_many(symbols)
+        spot_by_symbol = {symbol: quote.price for symbol, quote in quotes.items() if quote is not None}
+        
+        legs = [
+            (i, contract)
+            for i, pos in enumerate(positions) if pos.symbol in spot_by_symbol
+            for contract in pos.contracts
+        ]
+        if not legs:
+            return priced, totals
+        
+        today = date.today()
+        owner = np.fromiter((i for i, _ in legs), np.intp, len(legs))
+        S = np.fromiter((spot_by_symbol[positions[i].symbol] for i, _ in legs), np.float64, len(legs))
+        K = np.fromiter((c.strike for _, c in legs), np.float64, len(legs))
+        t = np.fromiter(((c.expiration - today).days for _, c in legs), np.float64, len(legs)) / 365.0
+        sigma = np.fromiter(
+            ((c.volatility.implied_volatility or 0.0) if c.volatility else 0.0 for _, c in legs),
+            np.float64, len(legs)
+        )
+        # A zero, negative or missing IV turns every model price and Greek into NaN
+        sigma = np.where(sigma > 0, sigma, settings.DEFAULT_IMPLIED_VOLATILITY)
+        is_call = np.fromiter((c.option_type == "call" for _, c in legs), np.bool_, len(legs))
+        quantity = np.fromiter((c.quantity for _, c in legs), np.float64, len(legs))
+        
+        price, delta, gamma, theta, vega = bsm_price_and_greeks(is_call, S, K, t, settings.RISK_FREE_RATE, sigma)
+        
+        # Mark to market where the legs are quoted (one batched lookup for all of
+        # them), keeping the model price for the rest
+        leg_keys = [(positions[i].symbol, c.strike, c.expiration, c.option_type.value) for i, c in legs]
+        market_prices = await self.market_data_service.get_option_prices_batch(leg_keys)
+        market = np.fromiter((market_prices.get(key) or np.nan for key in leg_keys), np.float64, len(legs))
+        price = np.where(np.isnan(market), price, market)
+        
+        # Signed by quantity so short legs count against the position; x100 option multiplier on value
+        totals['value'] = np.maximum(np.bincount(owner, weights=price * quantity * 100, minlength=n), 0.01)
+        for name, per_share in (('delta', delta), ('gamma', gamma), ('theta', theta), ('vega', vega)):
+            totals[name] = np.bincount(owner, weights=per_share * quantity, minlength=n)
+        priced[owner] = True
+        return priced, totals
+    
     async def _calculate_position_value(self, position: OptionsPosition) -> Optional[float]:
         """Calculate current position value using market data and option pricing"""
         try:
@@ -429,7 +580,7 @@ class OptionsService:
                 else:
                     # Fallback to previous calculation if market data fails
                     logger.warning(f"⚠️ No market data for {position.symbol} option, using fallback pricing")
-                    return position.current_value * random.uniform(0.9, 1.1)  # ±10% random movement
+                    return position.current_value * _RNG.uniform(0.9, 1.1)  # ±10% random movement
             
             return max(0.01, total_value)  # Minimum $0.01 position value
             
@@ -474,9 +625,11 @@ class OptionsService:
             # Calculate position sizing based on portfolio and risk
             position_size = self._calculate_position_size(max_risk, portfolio)
             
-            # Get REAL option chain data for the symbol
+            # Get REAL option chain data for the symbol, on the listed expiration
+            # closest to the time horizon so the contracts can be marked against it later
             logger.info(f"📊 Fetching live option chain for {symbol}...")
-            option_chain = await self.market_data_service.get_option_chain(symbol)
+            expiration = await self.market_data_service.get_listed_expiration(symbol, date.today() + timedelta(days=time_horizon_days))
+            option_chain = await self.market_data_service.get_option_chain(symbol, expiration) if expiration else None
             
             if not option_chain:
                 logger.error(f"❌ Could not get live option chain for {symbol}")
@@ -559,14 +712,18 @@ class OptionsService:
         try:
             contracts = []
             underlying_price = option_chain['underlying_price']
-            expiration_date = datetime.now() + timedelta(days=days_to_expiry)
+            # Contracts take the chain's listed expiration, so live quotes for them exist
+            if option_chain.get('expiration'):
+                expiration_date = date.fromisoformat(option_chain['expiration'])
+            else:
+                expiration_date = datetime.now() + timedelta(days=days_to_expiry)
             
             # Calculate contract count based on position size (assuming ~$1000 per contract)
             base_contract_count = max(1, int(position_size / 1000))
             
             if strategy_type in [StrategyType.LONG_CALL]:
                 # Find appropriate call strike from real option chain
-                call_options = option_chain.get('calls', [])
+                call_options = option_chain['calls']
                 
                 if target_strike:
                     # Use specific strike if provided by Claude
@@ -590,7 +747,7 @@ class OptionsService:
                 
             elif strategy_type in [StrategyType.LONG_PUT]:
                 # Find appropriate put strike from real option chain
-                put_options = option_chain.get('puts', [])
+                put_options = option_chain['puts']
                 
                 if target_strike:
                     # Use specific strike if provided by Claude
@@ -614,7 +771,7 @@ class OptionsService:
                 
             elif strategy_type == StrategyType.CALL_SPREAD:
                 # Create call spread using real option chain
-                call_options = option_chain.get('calls', [])
+                call_options = option_chain['calls']
                 short_strike = self._find_closest_strike(call_options, underlying_price * 1.03)
                 long_strike = self._find_closest_strike(call_options, underlying_price * 1.08)
                 
@@ -636,7 +793,7 @@ class OptionsService:
                 ])
             elif strategy_type == StrategyType.PUT_SPREAD:
                 # Create put spread using real option chain
-                put_options = option_chain.get('puts', [])
+                put_options = option_chain['puts']
                 short_strike = self._find_closest_strike(put_options, underlying_price * 0.97)
                 long_strike = self._find_closest_strike(put_options, underlying_price * 0.92)
                 
@@ -659,8 +816,8 @@ class OptionsService:
                     
             elif strategy_type == StrategyType.IRON_CONDOR:
                 # Create iron condor using real option chain
-                call_options = option_chain.get('calls', [])
-                put_options = option_chain.get('puts', [])
+                call_options = option_chain['calls']
+                put_options = option_chain['puts']
                 
                 # Short strikes closer to underlying
                 short_call_strike = self._find_closest_strike(call_options, underlying_price * 1.05)
@@ -710,22 +867,13 @@ class OptionsService:
             logger.error(f"❌ Failed to create real option contracts: {e}")
             return []
     
-    def _find_closest_strike(self, options_list: List[Dict], target_price: float) -> float:
+    def _find_closest_strike(self, options: pd.DataFrame, target_price: float) -> float:
         """Find the closest available strike price from real option chain"""
-        if not options_list:
+        if options.empty:
             return target_price
         
-        closest_strike = target_price
-        min_diff = float('inf')
-        
-        for option in options_list:
-            strike = option.get('strike', 0)
-            diff = abs(strike - target_price)
-            if diff < min_diff:
-                min_diff = diff
-                closest_strike = strike
-        
-        return closest_strike
+        strikes = options['strike'].to_numpy()
+        return float(strikes[np.abs(strikes - target_price).argmin()])
     
     def _calculate_strategy_performance(self, closed_positions: List[OptionsPosition]) -> Dict[str, Any]:
         """Calculate performance metrics by strategy type"""
@@ -758,15 +906,15 @@ class OptionsService:
             
             for contract in contracts:
                 # Find matching option in chain for real Greeks
-                options_list = option_chain['calls'] if contract.option_type == 'call' else option_chain['puts']
+                options = option_chain['calls'] if contract.option_type == 'call' else option_chain['puts']
                 
                 matching_option = None
-                for option in options_list:
-                    if abs(option.get('strike', 0) - contract.strike_price) < 0.01:
-                        matching_option = option
-                        break
+                if not options.empty:
+                    matches = np.flatnonzero(np.abs(options['strike'].to_numpy() - contract.strike_price) < 0.01)
+                    if matches.size:
+                        matching_option = options.iloc[matches[0]]
                 
-                if matching_option:
+                if matching_option is not None:
                     # Use real Greeks from option chain
                     delta = matching_option.get('delta', 0.5)
                     gamma = matching_option.get('gamma', 0.01)
@@ -806,22 +954,16 @@ class OptionsService:
     async def _get_average_iv(self, option_chain: Dict[str, Any]) -> float:
         """Calculate average implied volatility from real option chain"""
         try:
-            all_ivs = []
-            
-            # Collect IVs from calls
-            for call in option_chain.get('calls', []):
-                iv = call.get('impliedVolatility')
-                if iv and iv > 0:
-                    all_ivs.append(iv)
-            
-            # Collect IVs from puts
-            for put in option_chain.get('puts', []):
-                iv = put.get('impliedVolatility')
-                if iv and iv > 0:
-                    all_ivs.append(iv)
-            
-            if all_ivs:
-                return sum(all_ivs) / len(all_ivs)
+            # IVs across calls and puts, ignoring missing and non-positive quotes
+            all_ivs = np.concatenate([
+                options['impliedVolatility'].to_numpy(dtype=float)
+                for options in (option_chain['calls'], option_chain['puts'])
+                if 'impliedVolatility' in options.columns
+            ] or [np.empty(0)])
+            all_ivs = all_ivs[all_ivs > 0]
+            
+            if all_ivs.size:
+                return float(all_ivs.mean())
             else:
                 return 0.25  # Default IV if no data
                 
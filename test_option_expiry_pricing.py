@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test Option Expiry Pricing - legs on a later listed expiration get live prices from their own chain
+"""
+
+import asyncio
+import tempfile
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pandas as pd
+
+import src.services.market_data_service as market_data_module
+from src.services._market_cache import FileCache
+from src.services.market_data_service import MarketDataService
+
+NEAR = date.today() + timedelta(days=2)
+FAR = date.today() + timedelta(days=30)
+UNLISTED = date.today() + timedelta(days=21)
+
+class FakeTicker:
+    """Stands in for yf.Ticker with two listed expirations priced differently"""
+
+    options = (NEAR.isoformat(), FAR.isoformat())
+    fast_info = {"last_price": 500.0}
+
+    def __init__(self):
+        self.loaded = []
+
+    def option_chain(self, expiration: str):
+        self.loaded.append(expiration)
+        premium = 3.10 if expiration == NEAR.isoformat() else 12.40
+        frame = pd.DataFrame({
+            "strike": [495.0, 500.0, 505.0],
+            "lastPrice": [premium + 2, premium, premium - 2],
+            "bid": [0.0, 0.0, 0.0],
+            "ask": [0.0, 0.0, 0.0],
+            "volume": [10, 10, 10],
+            "openInterest": [100, 100, 100],
+        })
+        return SimpleNamespace(calls=frame, puts=frame.copy())
+
+async def run_expiry_pricing():
+    # Isolate the process-wide caches from any real data
+    market_data_module._quote_cache.clear()
+    market_data_module._chain_disk_cache = FileCache(tempfile.mkdtemp(), ttl=60)
+
+    ticker = FakeTicker()
+    service = MarketDataService()
+    service._ticker = lambda symbol: ticker
+
+    far_leg = ("SPY", 500.0, FAR, "call")
+    unlisted_leg = ("SPY", 500.0, UNLISTED, "call")
+    prices = await service.get_option_prices_batch([far_leg, unlisted_leg])
+
+    print(f"📊 {FAR} call: {prices[far_leg]}, {UNLISTED} call: {prices[unlisted_leg]}")
+    print(f"📦 Chains loaded: {ticker.loaded}")
+
+    assert prices[far_leg] == 12.40, "a leg on a later listed expiration is priced from its own chain"
+    assert prices[unlisted_leg] is None, "an unlisted expiration is not priced from another chain"
+    assert ticker.loaded == [FAR.isoformat()], "only the listed expiration's chain is downloaded"
+
+    # Contracts are created on the listed expiration closest to the time horizon
+    assert await service.get_listed_expiration("SPY", date.today() + timedelta(days=25)) == FAR.isoformat()
+
+def test_non_nearest_expiration_is_priced():
+    asyncio.run(run_expiry_pricing())
+
+if __name__ == "__main__":
+    test_non_nearest_expiration_is_priced()
+    print("✅ Option expiry pricing test passed")